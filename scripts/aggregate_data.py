@@ -5,7 +5,9 @@ Provides various aggregation views of the data.
 """
 
 import csv
-from collections import defaultdict
+import sys
+from collections import Counter, defaultdict
+from operator import itemgetter
 
 INPUT_CSV = 'output/companies_developers.csv'
 OUTPUT_DIR = 'output/'
@@ -19,39 +21,71 @@ def aggregate_data():
     # Load data
     print(f"\n📖 Reading {INPUT_CSV}...")
     
-    companies = defaultdict(lambda: {'developers': [], 'total_features': 0})
-    all_data = []
+    # Company and developer aggregates are both built while reading, in a single pass,
+    # as flat per-company and per-developer structures (no dict per entry)
+    company_developer_counts = Counter()
+    company_features = Counter()
+    developer_companies = defaultdict(set)
+    developer_features = Counter()
+    record_count = 0
     
     try:
         with open(INPUT_CSV, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                company = row['company']
-                developer = row['developer']
-                features = int(row['feature_count'])
+            reader = csv.reader(f)
+            
+            # Resolve column positions once instead of building a dict per row
+            # (an empty file has no header, hence no columns)
+            header = next(reader, [])
+            missing_columns = [column for column in ('company', 'developer', 'feature_count')
+                               if column not in header]
+            if missing_columns:
+                print(f"❌ Missing columns in {INPUT_CSV}: {', '.join(missing_columns)}")
+                return
+            company_idx = header.index('company')
+            developer_idx = header.index('developer')
+            count_idx = header.index('feature_count')
+            
+            # Blank lines are skipped, as DictReader does
+            for row in filter(None, reader):
+                # Interned: like a categorical column, each name is stored once
+                company = sys.intern(row[company_idx])
+                developer = sys.intern(row[developer_idx])
+                features = int(row[count_idx])
                 
-                all_data.append((company, developer, features))
-                companies[company]['developers'].append((developer, features))
-                companies[company]['total_features'] += features
+                record_count += 1
+                company_developer_counts[company] += 1
+                company_features[company] += features
+                developer_companies[developer].add(company)
+                developer_features[developer] += features
         
-        print(f"✅ Loaded {len(all_data)} records from {len(companies)} companies")
+        print(f"✅ Loaded {record_count} records from {len(company_features)} companies")
+        
+        # Nothing to aggregate (and no averages to compute)
+        if not record_count:
+            print(f"⚠️  No records found in {INPUT_CSV}")
+            return
         
     except FileNotFoundError:
         print(f"❌ File {INPUT_CSV} not found!")
         return
     
+    # One (company, developer count, total features, avg features per developer) row
+    # per company, computed once and reused by every ranking
+    company_rows = []
+    for company, dev_count in company_developer_counts.items():
+        total_feat = company_features[company]
+        avg_feat = total_feat / dev_count if dev_count > 0 else 0
+        company_rows.append((company, dev_count, total_feat, avg_feat))
+    
     # 1. Aggregate by Company (sum features)
     print(f"\n💾 Creating aggregation by company...")
     
     company_agg_file = f"{OUTPUT_DIR}companies_aggregated.csv"
-    with open(company_agg_file, 'w', encoding='utf-8', newline='') as f:
+    with open(company_agg_file, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f:
         writer = csv.writer(f)
         writer.writerow(['company', 'total_developers', 'total_features', 'avg_features_per_dev'])
         
-        for company in sorted(companies.keys()):
-            dev_count = len(companies[company]['developers'])
-            total_feat = companies[company]['total_features']
-            avg_feat = total_feat / dev_count if dev_count > 0 else 0
+        for company, dev_count, total_feat, avg_feat in sorted(company_rows):
             writer.writerow([company, dev_count, total_feat, f"{avg_feat:.2f}"])
     
     print(f"✅ Saved to {company_agg_file}")
@@ -59,28 +93,27 @@ def aggregate_data():
     # 2. Top developers by features (across all companies)
     print(f"\n💾 Creating top developers ranking...")
     
-    developer_totals = defaultdict(lambda: {'companies': set(), 'total_features': 0})
-    
-    for company, developer, features in all_data:
-        developer_totals[developer]['companies'].add(company)
-        developer_totals[developer]['total_features'] += features
+    # One (developer, total features, companies count) row per developer, plus the
+    # sorted, comma-separated companies of each developer, shared by every output below
+    developer_rows = [(developer, developer_features[developer], len(companies))
+                      for developer, companies in developer_companies.items()]
+    companies_lists = {developer: ', '.join(sorted(companies))
+                       for developer, companies in developer_companies.items()}
     
     top_devs_file = f"{OUTPUT_DIR}top_developers.csv"
-    with open(top_devs_file, 'w', encoding='utf-8', newline='') as f:
+    with open(top_devs_file, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f:
         writer = csv.writer(f)
         writer.writerow(['developer', 'total_features', 'companies_count', 'companies'])
         
         # Sort by total features
-        sorted_devs = sorted(developer_totals.items(), 
-                           key=lambda x: x[1]['total_features'], 
-                           reverse=True)
+        sorted_devs = sorted(developer_rows, key=itemgetter(1), reverse=True)
         
-        for developer, data in sorted_devs:
+        for developer, dev_features, companies_count in sorted_devs:
             writer.writerow([
                 developer, 
-                data['total_features'], 
-                len(data['companies']),
-                ', '.join(sorted(data['companies']))
+                dev_features, 
+                companies_count,
+                companies_lists[developer]
             ])
     
     print(f"✅ Saved to {top_devs_file}")
@@ -89,114 +122,103 @@ def aggregate_data():
     print(f"\n💾 Creating summary statistics...")
     
     stats_file = f"{OUTPUT_DIR}aggregation_summary.txt"
-    with open(stats_file, 'w', encoding='utf-8') as f:
-        f.write("AGGREGATION SUMMARY STATISTICS\n")
-        f.write("=" * 70 + "\n\n")
-        
-        # Overall stats
-        total_companies = len(companies)
-        total_developers = len(developer_totals)
-        total_features = sum(c['total_features'] for c in companies.values())
-        
-        f.write("📊 OVERALL STATISTICS\n")
-        f.write("-" * 70 + "\n")
-        f.write(f"Total companies: {total_companies}\n")
-        f.write(f"Total unique developers: {total_developers}\n")
-        f.write(f"Total features: {total_features}\n")
-        f.write(f"Average features per developer: {total_features/total_developers:.2f}\n")
-        f.write(f"Average features per company: {total_features/total_companies:.2f}\n\n")
-        
-        # Company rankings
-        f.write("=" * 70 + "\n")
-        f.write("🏢 COMPANIES RANKED BY TOTAL FEATURES\n")
-        f.write("=" * 70 + "\n\n")
-        
-        sorted_companies = sorted(companies.items(), 
-                                 key=lambda x: x[1]['total_features'], 
-                                 reverse=True)
-        
-        for i, (company, data) in enumerate(sorted_companies, 1):
-            dev_count = len(data['developers'])
-            feat_count = data['total_features']
-            avg = feat_count / dev_count if dev_count > 0 else 0
-            f.write(f"{i:2d}. {company:25s} - {feat_count:4d} features, "
-                   f"{dev_count:2d} developers (avg: {avg:6.2f})\n")
-        
-        # Company rankings by developer count
-        f.write("\n" + "=" * 70 + "\n")
-        f.write("🏢 COMPANIES RANKED BY DEVELOPER COUNT\n")
-        f.write("=" * 70 + "\n\n")
-        
-        sorted_by_devs = sorted(companies.items(), 
-                               key=lambda x: len(x[1]['developers']), 
-                               reverse=True)
-        
-        for i, (company, data) in enumerate(sorted_by_devs, 1):
-            dev_count = len(data['developers'])
-            feat_count = data['total_features']
-            f.write(f"{i:2d}. {company:25s} - {dev_count:2d} developers, "
-                   f"{feat_count:4d} features\n")
-        
-        # Top developers
-        f.write("\n" + "=" * 70 + "\n")
-        f.write("👨‍💻 TOP 20 DEVELOPERS BY FEATURE COUNT\n")
-        f.write("=" * 70 + "\n\n")
-        
-        sorted_devs = sorted(developer_totals.items(), 
-                           key=lambda x: x[1]['total_features'], 
-                           reverse=True)
-        
-        for i, (developer, data) in enumerate(sorted_devs[:20], 1):
-            companies_list = ', '.join(sorted(data['companies']))
-            f.write(f"{i:2d}. {developer:30s} - {data['total_features']:4d} features "
-                   f"({companies_list})\n")
+    # The report is assembled in memory and written with a single call
+    parts = []
+    parts.append("AGGREGATION SUMMARY STATISTICS\n")
+    parts.append("=" * 70 + "\n\n")
+    
+    # Overall stats
+    total_companies = len(company_rows)
+    total_developers = len(developer_rows)
+    total_features = sum(company_features.values())
+    
+    parts.append("📊 OVERALL STATISTICS\n")
+    parts.append("-" * 70 + "\n")
+    parts.append(f"Total companies: {total_companies}\n")
+    parts.append(f"Total unique developers: {total_developers}\n")
+    parts.append(f"Total features: {total_features}\n")
+    parts.append(f"Average features per developer: {total_features/total_developers:.2f}\n")
+    parts.append(f"Average features per company: {total_features/total_companies:.2f}\n\n")
+    
+    # Company rankings
+    parts.append("=" * 70 + "\n")
+    parts.append("🏢 COMPANIES RANKED BY TOTAL FEATURES\n")
+    parts.append("=" * 70 + "\n\n")
+    
+    sorted_companies = sorted(company_rows, key=itemgetter(2), reverse=True)
+    
+    for i, (company, dev_count, feat_count, avg) in enumerate(sorted_companies, 1):
+        parts.append(f"{i:2d}. {company:25s} - {feat_count:4d} features, "
+                     f"{dev_count:2d} developers (avg: {avg:6.2f})\n")
+    
+    # Company rankings by developer count
+    parts.append("\n" + "=" * 70 + "\n")
+    parts.append("🏢 COMPANIES RANKED BY DEVELOPER COUNT\n")
+    parts.append("=" * 70 + "\n\n")
+    
+    sorted_by_devs = sorted(company_rows, key=itemgetter(1), reverse=True)
+    
+    for i, (company, dev_count, feat_count, _) in enumerate(sorted_by_devs, 1):
+        parts.append(f"{i:2d}. {company:25s} - {dev_count:2d} developers, "
+                     f"{feat_count:4d} features\n")
+    
+    # Top developers
+    parts.append("\n" + "=" * 70 + "\n")
+    parts.append("👨‍💻 TOP 20 DEVELOPERS BY FEATURE COUNT\n")
+    parts.append("=" * 70 + "\n\n")
+    
+    # sorted_devs is the ranking already written to top_developers.csv
+    for i, (developer, dev_features, _) in enumerate(sorted_devs[:20], 1):
+        parts.append(f"{i:2d}. {developer:30s} - {dev_features:4d} features "
+                     f"({companies_lists[developer]})\n")
+    
+    # Multi-company developers
+    multi_company = [row for row in developer_rows if row[2] > 1]
+    
+    if multi_company:
+        parts.append("\n" + "=" * 70 + "\n")
+        parts.append("🔄 DEVELOPERS WORKING WITH MULTIPLE COMPANIES\n")
+        parts.append("=" * 70 + "\n\n")
         
-        # Multi-company developers
-        multi_company = [(dev, data) for dev, data in developer_totals.items() 
-                        if len(data['companies']) > 1]
+        # By companies count, then total features
+        sorted_multi = sorted(multi_company, key=itemgetter(2, 1), reverse=True)
         
-        if multi_company:
-            f.write("\n" + "=" * 70 + "\n")
-            f.write("🔄 DEVELOPERS WORKING WITH MULTIPLE COMPANIES\n")
-            f.write("=" * 70 + "\n\n")
-            
-            sorted_multi = sorted(multi_company, 
-                                key=lambda x: (len(x[1]['companies']), x[1]['total_features']), 
-                                reverse=True)
-            
-            for developer, data in sorted_multi:
-                companies_list = ', '.join(sorted(data['companies']))
-                f.write(f"• {developer:30s} - {len(data['companies'])} companies: "
-                       f"{companies_list} ({data['total_features']} features)\n")
-    
-    print(f"✅ Saved to {stats_file}")
+        for developer, dev_features, companies_count in sorted_multi:
+            parts.append(f"• {developer:30s} - {companies_count} companies: "
+                         f"{companies_lists[developer]} ({dev_features} features)\n")
     
-    # Console summary
-    print("\n" + "=" * 70)
-    print("📊 AGGREGATION SUMMARY")
-    print("=" * 70)
-    print(f"Total companies: {total_companies}")
-    print(f"Total unique developers: {total_developers}")
-    print(f"Total features: {total_features}")
-    print(f"Average features per developer: {total_features/total_developers:.2f}")
+    with open(stats_file, 'w', encoding='utf-8') as f:
+        f.write(''.join(parts))
     
-    print("\n🏆 Top 5 companies by features:")
-    for i, (company, data) in enumerate(sorted_companies[:5], 1):
-        print(f"  {i}. {company:25s} - {data['total_features']:4d} features "
-              f"({len(data['developers'])} developers)")
+    print(f"✅ Saved to {stats_file}")
     
-    print("\n🌟 Top 5 developers by features:")
-    for i, (developer, data) in enumerate(sorted_devs[:5], 1):
-        companies_list = ', '.join(sorted(data['companies']))
-        print(f"  {i}. {developer:30s} - {data['total_features']:4d} features ({companies_list})")
+    # Console summary, written to stdout in one call
+    summary = [
+        "\n" + "=" * 70,
+        "📊 AGGREGATION SUMMARY",
+        "=" * 70,
+        f"Total companies: {total_companies}",
+        f"Total unique developers: {total_developers}",
+        f"Total features: {total_features}",
+        f"Average features per developer: {total_features/total_developers:.2f}",
+        "\n🏆 Top 5 companies by features:",
+    ]
+    for i, (company, dev_count, feat_count, _) in enumerate(sorted_companies[:5], 1):
+        summary.append(f"  {i}. {company:25s} - {feat_count:4d} features "
+                       f"({dev_count} developers)")
+    
+    summary.append("\n🌟 Top 5 developers by features:")
+    for i, (developer, dev_features, _) in enumerate(sorted_devs[:5], 1):
+        summary.append(f"  {i}. {developer:30s} - {dev_features:4d} features ({companies_lists[developer]})")
     
     if multi_company:
-        print(f"\n🔄 Developers working with multiple companies: {len(multi_company)}")
+        summary.append(f"\n🔄 Developers working with multiple companies: {len(multi_company)}")
     
-    print("\n📁 Files generated:")
-    print(f"  • {company_agg_file}")
-    print(f"  • {top_devs_file}")
-    print(f"  • {stats_file}")
+    summary.append("\n📁 Files generated:")
+    summary.append(f"  • {company_agg_file}")
+    summary.append(f"  • {top_devs_file}")
+    summary.append(f"  • {stats_file}")
+    sys.stdout.write('\n'.join(summary) + '\n')
     
     print("\n🎉 Aggregation completed!")
 
@@ -7,12 +7,29 @@ Script to download ZIP archives from QGIS changelog pages
 Versions: from 3.0 to 3.44
 """
 
+import json
 import os
 import requests
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3Error
+from urllib3.util import Retry
 
-DOWNLOAD_DIR = "data/qgis_downloads"
+DOWNLOAD_DIR = Path("data/qgis_downloads")
 URLS_FILE = "changelog_urls.txt"
+HTTP_CACHE_FILE = DOWNLOAD_DIR / ".http_cache.json"
+MAX_WORKERS = 8
+POOL_SIZE = 16
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 0.5
+CHUNK_SIZE = 1024 * 1024  # 1 MiB: gli ZIP vengono scritti su disco senza elaborazione
+
+# Protegge la cache HTTP condivisa tra i thread di download
+HTTP_CACHE_LOCK = threading.Lock()
 
 def load_changelog_urls(filename):
     """Carica gli URL dal file di configurazione"""
@@ -41,41 +58,139 @@ def extract_version_from_url(url):
 
 def create_download_directory():
     """Crea la directory per i download se non esiste"""
-    Path(DOWNLOAD_DIR).mkdir(parents=True, exist_ok=True)
+    DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
     print(f"📁 Directory di download: {DOWNLOAD_DIR}")
 
-def check_url_exists(url):
-    """Verifica se l'URL esiste ed è accessibile"""
+def log(message):
+    """Stampa un messaggio con una sola scrittura, così le righe dei thread non si mescolano"""
+    sys.stdout.write(message + '\n')
+
+def load_http_cache():
+    """Carica ETag/Last-Modified salvati per ogni URL nelle esecuzioni precedenti"""
     try:
-        response = requests.head(url, timeout=10, allow_redirects=True)
-        return response.status_code == 200
-    except requests.RequestException:
-        return False
+        with open(HTTP_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_http_cache(http_cache):
+    """Salva la cache HTTP accanto agli archivi scaricati"""
+    with open(HTTP_CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(http_cache, f, indent=2, sort_keys=True)
 
-def download_file(url, destination):
-    """Scarica un file da URL verso la destinazione specificata"""
+def create_session():
+    """Crea una sessione HTTP con connessioni riutilizzabili tra i thread"""
+    session = requests.Session()
+    # Errori di rete ed errori 5xx temporanei vengono ritentati con backoff esponenziale;
+    # la richiesta ritentata mantiene l'header Range e riprende dal file .part
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=('GET', 'HEAD'),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def download_file(session, url, destination, http_cache, start=0, validate=False):
+    """
+    Scarica un file da URL verso la destinazione specificata.
+    start indica la dimensione del file .part già presente da cui riprendere;
+    con validate=True la GET è condizionale sui valori salvati in http_cache.
+    Restituisce 'downloaded', 'not_modified', 'missing' (URL inesistente) oppure 'failed'.
+    """
+    # Il download avviene su un file .part che viene ripreso alla prossima esecuzione
+    part_file = destination.with_name(destination.name + '.part')
     try:
-        print(f"  ⬇️  Scaricamento: {os.path.basename(destination)}")
-        response = requests.get(url, stream=True, timeout=60)
+        headers = {'Range': f'bytes={start}-'} if start else {}
+        
+        if validate:
+            # GET condizionale: un 304 termina subito senza corpo
+            cached = http_cache[url]
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+            log(f"  🔄 Verifica aggiornamenti: {destination.name}")
+        elif start:
+            log(f"  ⏯️  Ripresa: {destination.name} da {start / (1024 * 1024):.2f} MB")
+        else:
+            log(f"  ⬇️  Scaricamento: {destination.name}")
+        response = session.get(url, stream=True, timeout=60, headers=headers)
+        
+        if response.status_code == 304:
+            response.close()
+            log(f"  ⏭️  Non modificato: {destination.name}")
+            return 'not_modified'
+        
+        # File parziale non più valido (es. archivio cambiato sul server): si riparte da zero
+        # (il .part può non esistere più, o mancare se la richiesta era senza Range)
+        if response.status_code == 416:
+            response.close()
+            part_file.unlink(missing_ok=True)
+            response = session.get(url, stream=True, timeout=60)
+        
+        # La GET sostituisce la vecchia verifica HEAD: un 404 indica URL inesistente
+        if response.status_code == 404:
+            response.close()
+            log(f"  ❌ URL non trovato o non accessibile: {url}")
+            return 'missing'
         response.raise_for_status()
         
-        # Scarica con progress
-        total_size = int(response.headers.get('content-length', 0))
-        downloaded = 0
+        # 206 = il server ha accettato il Range, altrimenti riscrive l'intero file
+        mode = 'ab' if response.status_code == 206 else 'wb'
         
-        with open(destination, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
+        # Copia diretta dal socket al file, senza ricomporre i chunk in Python
+        response.raw.decode_content = True
+        with open(part_file, mode) as f:
+            shutil.copyfileobj(response.raw, f, length=CHUNK_SIZE)
         
-        size_mb = os.path.getsize(destination) / (1024 * 1024)
-        print(f"  ✅ Completato: {os.path.basename(destination)} ({size_mb:.2f} MB)")
-        return True
+        part_file.replace(destination)
+        size = destination.stat().st_size
+        with HTTP_CACHE_LOCK:
+            http_cache[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'size': size,
+            }
+        size_mb = size / (1024 * 1024)
+        log(f"  ✅ Completato: {destination.name} ({size_mb:.2f} MB)")
+        return 'downloaded'
         
-    except requests.RequestException as e:
-        print(f"  ❌ Errore durante il download di {url}: {e}")
-        return False
+    except (requests.RequestException, Urllib3Error) as e:
+        # Leggendo da response.raw gli errori di rete arrivano come eccezioni urllib3
+        log(f"  ❌ Errore durante il download di {url}: {e}")
+        return 'failed'
+
+def scan_existing_files():
+    """Restituisce {nome_file: dimensione} dei file già presenti nella directory di download"""
+    with os.scandir(DOWNLOAD_DIR) as entries:
+        return {entry.name: entry.stat().st_size for entry in entries if entry.is_file()}
+
+def download_version(session, url, existing_files, http_cache):
+    """Scarica l'archivio di una singola versione e restituisce l'esito"""
+    version_str = extract_version_from_url(url)
+    
+    log(f"\n📋 Versione {version_str}\n   URL: {url}")
+    
+    # Nome del file basato sulla versione
+    filename = f"qgis_{version_str}_changelog.zip"
+    destination = DOWNLOAD_DIR / filename
+    
+    # File già esistente: se ETag/Last-Modified sono noti lo si riverifica con una
+    # GET condizionale, altrimenti viene saltato come in passato
+    file_size = existing_files.get(filename)
+    if file_size is not None:
+        if url in http_cache:
+            return download_file(session, url, destination, http_cache, validate=True)
+        log(f"   ⏭️  File già esistente: {filename} ({file_size / (1024 * 1024):.2f} MB)")
+        return 'skipped'
+    
+    start = existing_files.get(filename + '.part', 0)
+    return download_file(session, url, destination, http_cache, start)
 
 def main():
     """Funzione principale"""
@@ -91,37 +206,31 @@ def main():
     
     create_download_directory()
     
+    # Un'unica scansione della directory sostituisce i controlli exists/getsize per file
+    existing_files = scan_existing_files()
+    http_cache = load_http_cache()
+    session = create_session()
     total_attempts = 0
     successful_downloads = 0
     skipped = 0
     
-    for url in changelog_urls:
-        version_str = extract_version_from_url(url)
-        
-        print(f"\n📋 Versione {version_str}")
-        print(f"   URL: {url}")
-        
-        # Nome del file basato sulla versione
-        filename = f"qgis_{version_str}_changelog.zip"
-        destination = os.path.join(DOWNLOAD_DIR, filename)
-        
-        # Salta se il file esiste già
-        if os.path.exists(destination):
-            file_size = os.path.getsize(destination) / (1024 * 1024)
-            print(f"   ⏭️  File già esistente: {filename} ({file_size:.2f} MB)")
-            skipped += 1
-            continue
-        
-        # Verifica se l'URL esiste
-        if not check_url_exists(url):
-            print(f"   ❌ URL non trovato o non accessibile")
-            continue
-        
-        total_attempts += 1
-        print(f"   ⬇️  Scaricamento in corso...")
-        
-        if download_file(url, destination):
-            successful_downloads += 1
+    # Download in parallelo: i contatori vengono aggiornati solo nel thread principale
+    # (mai più thread che URL da scaricare)
+    workers = min(MAX_WORKERS, len(changelog_urls))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(download_version, session, url, existing_files, http_cache) for url in changelog_urls]
+        for future in as_completed(futures):
+            status = future.result()
+            if status in ('skipped', 'not_modified'):
+                skipped += 1
+            elif status == 'downloaded':
+                total_attempts += 1
+                successful_downloads += 1
+            elif status == 'failed':
+                total_attempts += 1
+    
+    session.close()
+    save_http_cache(http_cache)
     
     # Riepilogo finale
     print("\n" + "=" * 60)
@@ -132,7 +241,7 @@ def main():
     print(f"✅ Download completati con successo: {successful_downloads}")
     if total_attempts > 0:
         print(f"📈 Tasso di successo: {(successful_downloads/total_attempts)*100:.1f}%")
-    print(f"📁 Posizione file: {os.path.abspath(DOWNLOAD_DIR)}")
+    print(f"📁 Posizione file: {DOWNLOAD_DIR.resolve()}")
     print("\n🎉 Processo completato!")
 
 if __name__ == "__main__":
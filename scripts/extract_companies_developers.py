@@ -6,153 +6,178 @@ Creates a mapping of companies to developers with normalization of similar compa
 
 import csv
 import re
-from collections import defaultdict
+import sys
+from collections import Counter, defaultdict
+from functools import lru_cache
+from operator import itemgetter
 
 INPUT_CSV = "output/qgis_features_normalized_dev.csv"
 OUTPUT_CSV = "output/companies_developers.csv"
 OUTPUT_TXT = "output/companies_developers.txt"
 
+# Regex patterns compiled once at import time
+PARENTHESES_PATTERN = re.compile(r'\s*\(.*?\)\s*')
+MENTION_PATTERN = re.compile(r'\s*@.*$')
+BOLD_PATTERN = re.compile(r'\s*\*\*\s*')
+# Separators of collaborations (multiple developers/companies)
+COLLABORATION_PATTERN = re.compile(r' & | and |, | with ')
+# "Developer (Company)" or "Company (Developer)"
+DEVELOPER_COMPANY_PATTERN = re.compile(r'^(.+?)\s*\(([^)]+)\)$')
+
+# Keywords identifying company names, matched ignoring spaces in a single regex scan
+COMPANY_KEYWORDS = ('lutra', 'opengis', 'oslandia', 'kartoza', 'north road',
+                    'faunalia', 'qcooperative', 'spatialys', '3liz', 'qgis')
+COMPANY_KEYWORDS_PATTERN = re.compile(
+    '|'.join(re.escape(keyword.replace(' ', '')) for keyword in COMPANY_KEYWORDS)
+)
+
+# Known variations of company names (casefolded) and their canonical forms
+COMPANY_MAPPINGS = {
+    # OPENGIS variations
+    'opengis.ch': 'OPENGIS.ch',
+    'opengis': 'OPENGIS.ch',
+    'opengisch': 'OPENGIS.ch',
+    'opengis.ch gmbh': 'OPENGIS.ch',
+    
+    # Lutra Consulting variations
+    'lutra consulting': 'Lutra Consulting',
+    'lutraconsulting': 'Lutra Consulting',
+    'lutra': 'Lutra Consulting',
+    
+    # Oslandia variations
+    'oslandia': 'Oslandia',
+    'oslandia -': 'Oslandia',
+    
+    # North Road variations
+    'north road': 'North Road',
+    'north road consulting': 'North Road',
+    
+    # Kartoza variations
+    'kartoza': 'Kartoza',
+    'for kartoza': 'Kartoza',
+    
+    # Faunalia variations
+    'faunalia': 'Faunalia',
+    
+    # 3Liz variations
+    '3liz': '3Liz',
+    '3liz.com': '3Liz',
+    
+    # QGIS variations
+    'qgis.org donors and sponsors': 'QGIS.ORG donors and sponsors',
+    'qgis.org': 'QGIS.ORG',
+    'qgis grant program': 'QGIS Grant Program',
+    'qgis': 'QGIS',
+    
+    # iMHere Asia variations
+    'imhere asia': 'iMHere Asia',
+    'imhere-asia': 'iMHere Asia',
+    
+    # QCooperative variations
+    'qcooperative': 'QCooperative',
+    'qcooperative /': 'QCooperative',
+    'itopen / qcooperative': 'QCooperative',
+    
+    # Spatialys variations
+    'spatialys': 'Spatialys',
+    
+    # Swiss QGIS user group variations
+    'swiss qgis user group': 'Swiss QGIS User Group',
+    'swiss qgis user-group': 'Swiss QGIS User Group',
+    'the swiss qgis user group': 'Swiss QGIS User Group',
+    'qgis swiss user group': 'Swiss QGIS User Group',
+    
+    # Bordeaux variations
+    'bordeaux metropole': 'Bordeaux Métropole',
+    'bordeaux métropôle': 'Bordeaux Métropole',
+    'bordeaux métrôpole': 'Bordeaux Métropole',
+    'métropôle de bordeaux': 'Bordeaux Métropole',
+    
+    # Lille variations
+    'métropole européenne de lille': 'Métropole Européenne de Lille',
+    'métropole de lille': 'Métropole Européenne de Lille',
+    'lille metropole': 'Métropole Européenne de Lille',
+    'metropole de lille': 'Métropole Européenne de Lille',
+    
+    # Ifremer
+    'ifremer': 'Ifremer',
+    
+    # ARPA Piemonte variations
+    'arpa piemonte': 'ARPA Piemonte',
+    '**arpa piemonte**': 'ARPA Piemonte',
+    'a.r.p.a. piemonte': 'ARPA Piemonte',
+}
+
+# Known name normalizations for developers
+DEVELOPER_NORMALIZATIONS = {
+    'Martian Dobias': 'Martin Dobias',
+    'Alex Bruy': 'Alexander Bruy',
+    'Belgacem Nedjima': 'Nedjima Belgacem',
+}
+
+@lru_cache(maxsize=8192)
 def normalize_company_name(company):
     """
     Normalize company names to handle variations and typos.
     Returns a standardized version of the company name.
+    Results are cached: the function must depend only on its argument.
     """
     if not company or company == "Not specified":
         return company
     
-    # Dictionary of known variations and their canonical forms
-    company_mappings = {
-        # OPENGIS variations
-        'opengis.ch': 'OPENGIS.ch',
-        'opengis': 'OPENGIS.ch',
-        'opengisch': 'OPENGIS.ch',
-        'opengis.ch gmbh': 'OPENGIS.ch',
-        
-        # Lutra Consulting variations
-        'lutra consulting': 'Lutra Consulting',
-        'lutraconsulting': 'Lutra Consulting',
-        'lutra': 'Lutra Consulting',
-        
-        # Oslandia variations
-        'oslandia': 'Oslandia',
-        'oslandia -': 'Oslandia',
-        
-        # North Road variations
-        'north road': 'North Road',
-        'north road consulting': 'North Road',
-        
-        # Kartoza variations
-        'kartoza': 'Kartoza',
-        'for kartoza': 'Kartoza',
-        
-        # Faunalia variations
-        'faunalia': 'Faunalia',
-        
-        # 3Liz variations
-        '3liz': '3Liz',
-        '3liz.com': '3Liz',
-        
-        # QGIS variations
-        'qgis.org donors and sponsors': 'QGIS.ORG donors and sponsors',
-        'qgis.org': 'QGIS.ORG',
-        'qgis grant program': 'QGIS Grant Program',
-        'qgis': 'QGIS',
-        
-        # iMHere Asia variations
-        'imhere asia': 'iMHere Asia',
-        'imhere-asia': 'iMHere Asia',
-        
-        # QCooperative variations
-        'qcooperative': 'QCooperative',
-        'qcooperative /': 'QCooperative',
-        'itopen / qcooperative': 'QCooperative',
-        
-        # Spatialys variations
-        'spatialys': 'Spatialys',
-        
-        # Swiss QGIS user group variations
-        'swiss qgis user group': 'Swiss QGIS User Group',
-        'swiss qgis user-group': 'Swiss QGIS User Group',
-        'the swiss qgis user group': 'Swiss QGIS User Group',
-        'qgis swiss user group': 'Swiss QGIS User Group',
-        
-        # Bordeaux variations
-        'bordeaux metropole': 'Bordeaux Métropole',
-        'bordeaux métropôle': 'Bordeaux Métropole',
-        'bordeaux métrôpole': 'Bordeaux Métropole',
-        'métropôle de bordeaux': 'Bordeaux Métropole',
-        
-        # Lille variations
-        'métropole européenne de lille': 'Métropole Européenne de Lille',
-        'métropole de lille': 'Métropole Européenne de Lille',
-        'lille metropole': 'Métropole Européenne de Lille',
-        'metropole de lille': 'Métropole Européenne de Lille',
-        
-        # Ifremer
-        'ifremer': 'Ifremer',
-        
-        # ARPA Piemonte variations
-        'arpa piemonte': 'ARPA Piemonte',
-        '**arpa piemonte**': 'ARPA Piemonte',
-        'a.r.p.a. piemonte': 'ARPA Piemonte',
-    }
-    
-    # Normalize to lowercase for matching
-    company_lower = company.lower().strip()
+    # Normalize case for matching (casefold also folds e.g. ß to ss)
+    company_lower = company.casefold().strip()
     
     # Remove common prefixes/suffixes that don't affect identity
-    company_lower = re.sub(r'\s*\(.*?\)\s*', '', company_lower)  # Remove parentheses content
-    company_lower = re.sub(r'\s*@.*$', '', company_lower)  # Remove @ mentions
-    company_lower = re.sub(r'\s*\*\*\s*', '', company_lower)  # Remove markdown bold
+    company_lower = PARENTHESES_PATTERN.sub('', company_lower)  # Remove parentheses content
+    company_lower = MENTION_PATTERN.sub('', company_lower)  # Remove @ mentions
+    company_lower = BOLD_PATTERN.sub('', company_lower)  # Remove markdown bold
     company_lower = company_lower.strip()
     
     # Check if we have a known mapping
-    if company_lower in company_mappings:
-        return company_mappings[company_lower]
+    if company_lower in COMPANY_MAPPINGS:
+        return COMPANY_MAPPINGS[company_lower]
     
     # If not in mappings, return original with basic cleanup
     result = company.strip()
-    result = re.sub(r'\s*\*\*\s*', '', result)  # Remove markdown bold
-    result = re.sub(r'\s+', ' ', result)  # Normalize spaces
+    result = BOLD_PATTERN.sub('', result)  # Remove markdown bold
+    result = ' '.join(result.split())  # Normalize spaces
     
     return result
 
+@lru_cache(maxsize=8192)
 def is_company_name(text):
-    """Check if text looks like a company name"""
-    company_keywords = ['lutra', 'opengis', 'oslandia', 'kartoza', 'north road', 
-                       'faunalia', 'qcooperative', 'spatialys', '3liz', 'qgis']
+    """Check if text looks like a company name (cached, pure function of text)"""
     text_lower = text.lower().replace(' ', '')
-    return any(keyword.replace(' ', '') in text_lower for keyword in company_keywords)
+    return COMPANY_KEYWORDS_PATTERN.search(text_lower) is not None
 
 def extract_companies_developers():
     """Extract and map companies to their developers"""
     
-    # Dictionary: company -> set of developers
-    company_developers = defaultdict(set)
-    # Dictionary: (company, developer) -> count of features
-    company_developer_features = defaultdict(int)
-    
-    # Known name normalizations for developers
-    developer_normalizations = {
-        'Martian Dobias': 'Martin Dobias',
-        'Alex Bruy': 'Alexander Bruy',
-        'Belgacem Nedjima': 'Nedjima Belgacem',
-    }
+    # Dictionary: company -> Counter(developer -> count of features)
+    company_developers = defaultdict(Counter)
     
     print("🔍 Reading CSV file...")
     
     try:
         with open(INPUT_CSV, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+            reader = csv.reader(f)
             
-            for row in reader:
-                developer = row['developed_by'].strip()
-                
+            # Only developed_by is needed: resolve its position once
+            header = next(reader, [])
+            dev_idx = header.index('developed_by')
+            
+            # The same developer string appears on many features: count the
+            # occurrences of each distinct value first, then parse each one once
+            # (blank lines are skipped, as DictReader does)
+            developer_occurrences = Counter(row[dev_idx].strip() for row in filter(None, reader))
+            
+            for developer, occurrences in developer_occurrences.items():
                 if not developer or developer == 'Not specified':
                     continue
                 
                 # Skip entries with collaborations (multiple developers/companies)
-                if any(separator in developer for separator in [' & ', ' and ', ', ', ' with ']):
+                if COLLABORATION_PATTERN.search(developer):
                     continue
                 
                 # Handle "Company / Developer" pattern
@@ -161,10 +186,10 @@ def extract_companies_developers():
                     if len(parts) == 2 and is_company_name(parts[0]):
                         company = parts[0].strip()
                         dev_name = parts[1].strip().strip('"')
-                        normalized_company = normalize_company_name(company)
-                        dev_name = developer_normalizations.get(dev_name, dev_name)
-                        company_developers[normalized_company].add(dev_name)
-                        company_developer_features[(normalized_company, dev_name)] += 1
+                        # Interned: the same names are dictionary keys across many entries
+                        normalized_company = sys.intern(normalize_company_name(company))
+                        dev_name = sys.intern(DEVELOPER_NORMALIZATIONS.get(dev_name, dev_name))
+                        company_developers[normalized_company][dev_name] += occurrences
                         continue
                 
                 # Skip entries that are just company names without developers
@@ -172,7 +197,7 @@ def extract_companies_developers():
                     continue
                 
                 # Pattern to extract company from "Developer (Company)"
-                match = re.search(r'^(.+?)\s*\(([^)]+)\)$', developer)
+                match = DEVELOPER_COMPANY_PATTERN.match(developer)
                 
                 if match:
                     first_part = match.group(1).strip().strip('"')
@@ -194,11 +219,10 @@ def extract_companies_developers():
                         if dev_name == "Alessandro Pasotti" and "North Road" in company:
                             continue
                         
-                        # Normalize names
-                        dev_name = developer_normalizations.get(dev_name, dev_name)
-                        normalized_company = normalize_company_name(company)
-                        company_developers[normalized_company].add(dev_name)
-                        company_developer_features[(normalized_company, dev_name)] += 1
+                        # Normalize names (interned, as above)
+                        dev_name = sys.intern(DEVELOPER_NORMALIZATIONS.get(dev_name, dev_name))
+                        normalized_company = sys.intern(normalize_company_name(company))
+                        company_developers[normalized_company][dev_name] += occurrences
         
         print(f"✅ Processed {INPUT_CSV}")
         
@@ -213,22 +237,19 @@ def extract_companies_developers():
     # Save to CSV
     print(f"\n💾 Saving to CSV: {OUTPUT_CSV}")
     
-    csv_data = []
-    for company in sorted(company_developers.keys()):
-        developers = sorted(company_developers[company])
-        for developer in developers:
-            feature_count = company_developer_features[(company, developer)]
-            csv_data.append({
-                'company': company,
-                'developer': developer,
-                'feature_count': feature_count
-            })
+    # Developers of each company sorted once, for both the CSV and the text report
+    sorted_developers = {company: sorted(developers) for company, developers in company_developers.items()}
     
     try:
-        with open(OUTPUT_CSV, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=['company', 'developer', 'feature_count'])
-            writer.writeheader()
-            writer.writerows(csv_data)
+        with open(OUTPUT_CSV, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f:
+            writer = csv.writer(f)
+            writer.writerow(['company', 'developer', 'feature_count'])
+            # Rows are generated while writing, sorted by company then developer
+            writer.writerows(
+                (company, developer, company_developers[company][developer])
+                for company in sorted(company_developers)
+                for developer in sorted_developers[company]
+            )
         print(f"✅ CSV saved: {OUTPUT_CSV}")
     except Exception as e:
         print(f"⚠️  Could not save CSV: {e}")
@@ -243,50 +264,43 @@ def extract_companies_developers():
     output_lines.append(header)
     output_lines.append("")
     
-    print("\n" + header)
-    print(title)
-    print(header)
-    print()
-    
-    # Sort companies by number of developers (descending)
+    # Sort companies by number of developers (descending), once for the
+    # report and the top 20 statistics
     sorted_companies = sorted(
-        company_developers.items(),
-        key=lambda x: len(x[1]),
+        ((company, developers, len(developers)) for company, developers in company_developers.items()),
+        key=itemgetter(2),
         reverse=True
     )
     
-    for company, developers in sorted_companies:
-        developers_list = sorted(developers)
+    for company, developers, _ in sorted_companies:
+        developers_list = sorted_developers[company]
         if developers_list:
             # Count total features for this company
-            total_features = sum(company_developer_features[(company, dev)] for dev in developers_list)
+            total_features = sum(developers.values())
             
             company_line = f"🏢 {company} ({len(developers_list)} sviluppatori, {total_features} features)"
             output_lines.append(company_line)
-            print(company_line)
             
             for developer in developers_list:
-                feature_count = company_developer_features[(company, developer)]
+                feature_count = developers[developer]
                 dev_line = f"   👤 {developer} ({feature_count} features)"
                 output_lines.append(dev_line)
-                print(dev_line)
             
             output_lines.append("")
-            print()
     
     footer = f"Totale aziende identificate: {len(company_developers)}"
     output_lines.append(header)
     output_lines.append(footer)
     output_lines.append(header)
     
-    print(header)
-    print(footer)
-    print(header)
+    # The report is formatted once, then printed and saved as a whole
+    report = '\n'.join(output_lines)
+    sys.stdout.write('\n' + report + '\n')
     
     # Save to text file
     try:
         with open(OUTPUT_TXT, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(output_lines))
+            f.write(report)
         print(f"\n💾 Results saved to: {OUTPUT_TXT}")
     except Exception as e:
         print(f"\n⚠️  Could not save text file: {e}")
@@ -296,15 +310,9 @@ def extract_companies_developers():
     print("STATISTICHE TOP 20 AZIENDE PER NUMERO DI SVILUPPATORI")
     print("=" * 70)
     
-    top_companies = sorted(
-        company_developers.items(),
-        key=lambda x: len(x[1]),
-        reverse=True
-    )[:20]
-    
-    for company, developers in top_companies:
-        total_features = sum(company_developer_features[(company, dev)] for dev in developers)
-        print(f"   {len(developers):2d} sviluppatori, {total_features:4d} features: {company}")
+    for company, developers, developer_count in sorted_companies[:20]:
+        total_features = sum(developers.values())
+        print(f"   {developer_count:2d} sviluppatori, {total_features:4d} features: {company}")
     
     print("=" * 70)
 
@@ -9,52 +9,86 @@ Analizza i campi developed_by e funded_by per creare una mappatura degli svilupp
 
 import csv
 import re
-from collections import defaultdict
+import sys
+from collections import Counter
 
 INPUT_CSV = "output/qgis_features_raw.csv"
 OUTPUT_TXT = "output/developers_companies.txt"
 
+# Pattern to extract name and company from "Name (Company)"
+DEVELOPER_COMPANY_PATTERN = re.compile(r'^(.+?)\s*\(([^)]+)\)$')
+
+# Organization keywords that must not be treated as developer names
+ORG_KEYWORDS = ('kartoza', 'north road', 'oslandia', 'opengis', 'lutra', 'faunalia')
+
 def extract_developers_and_companies():
     """Extract and map developers to their associated companies"""
     
-    # Dictionary to map developers to companies
-    developer_companies = defaultdict(set)
+    # Dictionary to map developers to companies (insertion-ordered dict used as a set)
+    developer_companies = {}
+    # Number of developers per company, updated as companies are first linked
+    company_counts = Counter()
+    
+    def add_company(developer, company):
+        """Link a company to a developer, counting each pair once"""
+        companies = developer_companies.setdefault(developer, {})
+        if company not in companies:
+            companies[company] = None
+            company_counts[company] += 1
     
     print("🔍 Reading CSV file...")
     
     try:
         with open(INPUT_CSV, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+            reader = csv.reader(f)
             
-            for row in reader:
-                developer = row['developed_by'].strip()
+            # Resolve column positions once instead of building a dict per row
+            # (an empty file has no header and no features: the report is empty)
+            header = next(reader, [])
+            if not header:
+                pairs = {}
+            else:
+                missing_columns = [column for column in ('developed_by', 'funded_by')
+                                   if column not in header]
+                if missing_columns:
+                    print(f"❌ Missing columns in {INPUT_CSV}: {', '.join(missing_columns)}")
+                    return
+                dev_idx = header.index('developed_by')
+                fund_idx = header.index('funded_by')
                 
+                # Many features share the same developer/funder pair: parse each
+                # distinct pair once, keeping first-seen order (blank lines are skipped,
+                # as DictReader does)
+                pairs = dict.fromkeys((row[dev_idx].strip(), row[fund_idx].strip()) for row in reader if row)
+            
+            for developer, funder in pairs:
                 if not developer or developer == 'Not specified':
                     continue
                 
-                # Pattern to extract name and company from "Name (Company)"
-                match = re.search(r'^(.+?)\s*\(([^)]+)\)$', developer)
+                match = DEVELOPER_COMPANY_PATTERN.match(developer)
                 
                 if match:
                     name = match.group(1).strip()
                     company = match.group(2).strip()
                     
-                    # Clean quotes from name
-                    name = name.strip('"')
+                    # Clean quotes from name (strip only allocates when quotes are present)
+                    if '"' in name:
+                        name = name.strip('"')
                     
                     # Ignore if company is a URL
-                    if not company.startswith('http'):
-                        developer_companies[name].add(company)
+                    if company[:4] != 'http':
+                        add_company(name, company)
                 else:
                     # If no parenthesis, check if there's info in the funder field
-                    funder = row['funded_by'].strip()
-                    if funder and funder != 'Not specified' and developer != 'Not specified':
+                    if funder and funder != 'Not specified':
                         # Clean quotes from developer name
-                        developer = developer.strip('"')
+                        if '"' in developer:
+                            developer = developer.strip('"')
                         # Only if developer doesn't contain organization keywords
-                        if not any(org in developer.lower() for org in ['kartoza', 'north road', 'oslandia', 'opengis', 'lutra', 'faunalia']):
-                            if not funder.startswith('http') and len(funder) < 50:
-                                developer_companies[developer].add(funder)
+                        developer_lower = developer.lower()
+                        if not any(org in developer_lower for org in ORG_KEYWORDS):
+                            if len(funder) < 50 and funder[:4] != 'http':
+                                add_company(developer, funder)
         
         print(f"✅ Processed {INPUT_CSV}")
         
@@ -66,68 +100,54 @@ def extract_developers_and_companies():
         print(f"❌ Error reading file: {e}")
         return
     
-    # Print results to console and save to file
-    output_lines = []
+    # Print results to console and stream them to file
+    try:
+        out = open(OUTPUT_TXT, 'w', encoding='utf-8', buffering=1 << 20)
+    except Exception as e:
+        print(f"\n⚠️  Could not save to file: {e}")
+        out = None
+    
+    def emit(text=""):
+        """Write one or more lines to the console and to the output file"""
+        text += '\n'
+        sys.stdout.write(text)
+        if out:
+            out.write(text)
     
     header = "=" * 70
     title = "SVILUPPATORI E AZIENDE ASSOCIATE"
     
-    output_lines.append(header)
-    output_lines.append(title)
-    output_lines.append(header)
-    output_lines.append("")
-    
-    print("\n" + header)
-    print(title)
-    print(header)
-    print()
-    
-    # Sort developers and their companies
-    for developer in sorted(developer_companies.keys()):
-        companies = sorted(developer_companies[developer])
-        if companies:
-            dev_line = f"👤 {developer}"
-            output_lines.append(dev_line)
-            print(dev_line)
-            
-            for company in companies:
-                comp_line = f"   🏢 {company}"
-                output_lines.append(comp_line)
-                print(comp_line)
-            
-            output_lines.append("")
-            print()
-    
-    footer = f"Totale sviluppatori identificati: {len(developer_companies)}"
-    output_lines.append(header)
-    output_lines.append(footer)
-    output_lines.append(header)
-    
-    print(header)
-    print(footer)
-    print(header)
-    
-    # Save to text file
     try:
-        with open(OUTPUT_TXT, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(output_lines))
+        print()
+        emit(header)
+        emit(title)
+        emit(header)
+        emit()
+        
+        # Sort developers and their companies
+        for developer in sorted(developer_companies.keys()):
+            companies = sorted(developer_companies[developer])
+            if companies:
+                # One write per developer block, followed by a blank line
+                emit(f"👤 {developer}\n" + "".join(f"   🏢 {company}\n" for company in companies))
+        
+        emit(header)
+        emit(f"Totale sviluppatori identificati: {len(developer_companies)}")
+        emit(header)
+    finally:
+        if out:
+            out.close()
+    
+    if out:
         print(f"\n💾 Results saved to: {OUTPUT_TXT}")
-    except Exception as e:
-        print(f"\n⚠️  Could not save to file: {e}")
     
     # Additional statistics
     print("\n" + "=" * 70)
     print("STATISTICHE AZIENDE PIÙ FREQUENTI")
     print("=" * 70)
     
-    # Count companies occurrences
-    company_counts = defaultdict(int)
-    for companies in developer_companies.values():
-        for company in companies:
-            company_counts[company] += 1
-    
     # Print top 20 companies
-    top_companies = sorted(company_counts.items(), key=lambda x: x[1], reverse=True)[:20]
+    top_companies = company_counts.most_common(20)
     
     for company, count in top_companies:
         print(f"   {count:3d} sviluppatori: {company}")
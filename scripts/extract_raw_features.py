@@ -18,12 +18,63 @@ Legge i file .md all'interno degli ZIP ed estrae i dati grezzi senza normalizzaz
 import os
 import zipfile
 import re
+import hashlib
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 import csv
+from collections import Counter
+from dataclasses import dataclass, replace
+from operator import attrgetter
 
 DOWNLOAD_DIR = "data/qgis_downloads"
 OUTPUT_CSV = "output/qgis_features_raw.csv"
 
+# Regex patterns compiled once at import time
+# Pattern compilati una sola volta all'avvio
+ZIP_NAME_PATTERN = re.compile(r'^qgis[_-]v?(.+?)(?:_changelog)?\.zip$', re.IGNORECASE)
+ZIP_EXTENSION_PATTERN = re.compile(r'\.zip$', re.IGNORECASE)
+MD_LINK_PATTERN = re.compile(r'\[([^\]]+)\]\(([^\)]+)\)')
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+# Square brackets and emphasis markers, with the backslash of escaped markers (\\* \\_)
+MARKUP_CHARS_PATTERN = re.compile(r'\\[\[\]]*[*_]|[\[\]*_]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+LEADING_BRACKETS_PATTERN = re.compile(r'^[\[\]\(\)\{\}]+')
+TRAILING_SENTENCE_PATTERN = re.compile(r'This feature was.*$', re.IGNORECASE)
+CATEGORY_PATTERN = re.compile(r'^##\s+(.+?)$')
+FEATURE_PATTERN = re.compile(r'^###\s+Feature:\s*(.+?)$')
+# Matched at a heading line offset: indented headings do not start a section
+SECTION_START_PATTERN = re.compile(r'###[^\S\n]+Feature:|##[^\S\n]+')
+# Any line that can hold a heading: "##" after optional indentation.
+# The group is the line without surrounding whitespace (as str.strip());
+# each repetition ends on a non-space, so long blank runs never backtrack
+HEADING_LINE_PATTERN = re.compile(r'^[^\S\n]*(##(?:[^\S\n]*\S)*)[^\S\n]*$', re.MULTILINE)
+# Lines scanned after a feature heading when looking for funder/developer
+MAX_SECTION_LINES = 99
+# Markdown files waiting in the parsing pool at any time: each pending file
+# keeps its raw bytes in memory until a worker has parsed it
+PARSE_WORKERS = os.cpu_count() or 1
+MAX_PENDING_PARSES = 2 * PARSE_WORKERS
+# Patterns handling multiline cases
+FUNDED_PATTERN = re.compile(r'(?:This feature was funded by|Funded by)\s+(.+?)(?=\n\n|\n###|\n##|$)', re.IGNORECASE | re.DOTALL)
+DEVELOPED_PATTERN = re.compile(r'(?:This feature was developed by|Developed by)\s+(.+?)(?=\n\n|\n###|\n##|$)', re.IGNORECASE | re.DOTALL)
+
+@dataclass
+class Feature:
+    """One feature row of the raw CSV (fields in column order)"""
+    # Slots declared by hand (dataclass(slots=True) needs Python 3.10),
+    # which is why the fields have no defaults
+    __slots__ = ('version', 'category', 'feature_name', 'funded_by', 'funded_by_link',
+                 'developed_by', 'developed_by_link', 'md_file')
+    version: str
+    category: str
+    feature_name: str
+    funded_by: str
+    funded_by_link: str
+    developed_by: str
+    developed_by_link: str
+    md_file: str
+
 def extract_version_from_filename(zip_filename):
     """
     Extract the QGIS version from a changelog ZIP filename.
@@ -40,33 +91,28 @@ def extract_version_from_filename(zip_filename):
     if name.lower().startswith('qgis_') and name.lower().endswith('_changelog.zip'):
         return name[len('qgis_'):-len('_changelog.zip')]
     # Nuova convenzione: QGIS-<versione>.zip
-    match = re.match(r'^qgis[_-]v?(.+?)(?:_changelog)?\.zip$', name, re.IGNORECASE)
+    match = ZIP_NAME_PATTERN.match(name)
     if match:
         return match.group(1)
     # Fallback: rimuovi solo l'estensione
-    return re.sub(r'\.zip$', '', name, flags=re.IGNORECASE)
+    return ZIP_EXTENSION_PATTERN.sub('', name)
 
 def extract_md_from_zip(zip_path):
-    """Extract the content of .md files from a ZIP archive"""
-    md_contents = []
-    
+    """
+    Yield (filename, raw bytes) for each .md file in a ZIP archive.
+    Entries are read one at a time instead of the whole archive at once; the
+    caller keeps at most MAX_PENDING_PARSES of them waiting to be parsed.
+    """
     try:
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
             # Find all .md files in the archive
-            md_files = [f for f in zip_ref.namelist() if f.endswith('.md')]
-            
-            for md_file in md_files:
-                content = zip_ref.read(md_file).decode('utf-8', errors='ignore')
-                md_contents.append({
-                    'filename': md_file,
-                    'content': content
-                })
+            for info in zip_ref.infolist():
+                if info.filename.endswith('.md'):
+                    with zip_ref.open(info) as fh:
+                        yield info.filename, fh.read()
                 
     except Exception as e:
         print(f"   ❌ Error opening {zip_path}: {e}")
-        return []
-    
-    return md_contents
 
 
 
@@ -74,45 +120,33 @@ def extract_links_from_markdown(text):
     """
     Extract markdown links [text](url) and return a list of URLs.
     """
-    links = re.findall(r'\[([^\]]+)\]\(([^\)]+)\)', text)
+    links = MD_LINK_PATTERN.findall(text)
     # Return only URLs (second element of each tuple)
     return [url for _, url in links] if links else []
 
 def clean_markdown_links(text):
     """Remove markdown links [text](url) leaving only the text"""
     # Pattern for [text](url)
-    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
+    text = MD_LINK_PATTERN.sub(r'\1', text)
     # Remove any HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-    # Remove remaining square brackets
-    text = text.replace('[', '').replace(']', '')
-    # Remove Markdown emphasis markers and their escaped form (** __ \* \_)
-    text = re.sub(r'\\([*_])', r'\1', text)  # unescape \* -> * , \_ -> _
-    text = re.sub(r'[*_]{1,3}', '', text)    # drop remaining * / _ emphasis
+    text = HTML_TAG_PATTERN.sub('', text)
+    # Remove remaining square brackets and Markdown emphasis markers
+    # with their escaped form (** __ \* \_) in one pass
+    text = MARKUP_CHARS_PATTERN.sub('', text)
     # Clean multiple spaces
-    text = re.sub(r'\s+', ' ', text)
+    text = WHITESPACE_PATTERN.sub(' ', text)
     return text.strip()
 
-def extract_developer_info_raw(text, lines, start_idx):
+def extract_developer_info_raw(text):
     """
-    Extract developer information handling multiline cases.
+    Extract developer information from the text matched after "developed by".
+    Continuation lines are already part of the match (up to a blank line or heading).
     Returns a tuple (cleaned_name, link)
     NO NORMALIZATION - keeps original text
     """
     # Clean initial text
     developer = text.strip()
     
-    # If text seems incomplete (ends with comma or very short),
-    # check next line as well
-    if start_idx + 1 < len(lines):
-        next_line = lines[start_idx + 1].strip()
-        # If next line doesn't start with markdown pattern (###, ##, #####)
-        # and is not empty, it might be the continuation
-        if next_line and not next_line.startswith('#') and not next_line.startswith('*'):
-            # If current developer ends with comma or seems truncated
-            if developer.endswith(',') or len(developer) < 5:
-                developer += ' ' + next_line
-    
     # Extract links before cleaning text
     links = extract_links_from_markdown(developer)
     developer_link = links[0] if links else ""
@@ -121,14 +155,14 @@ def extract_developer_info_raw(text, lines, start_idx):
     developer = clean_markdown_links(developer)
     
     # Remove residual special characters at beginning
-    developer = re.sub(r'^[\[\]\(\)\{\}]+', '', developer)
+    developer = LEADING_BRACKETS_PATTERN.sub('', developer)
     
     # Remove end patterns like "This feature was"
-    developer = re.sub(r'This feature was.*$', '', developer, flags=re.IGNORECASE)
+    developer = TRAILING_SENTENCE_PATTERN.sub('', developer)
     
     # Basic cleanup only - NO normalization
     developer = developer.strip()
-    developer = re.sub(r'\s+', ' ', developer)
+    developer = WHITESPACE_PATTERN.sub(' ', developer)
     
     # If empty after cleanup, return "Not specified"
     if not developer or developer == '':
@@ -136,22 +170,16 @@ def extract_developer_info_raw(text, lines, start_idx):
     
     return developer, developer_link
 
-def extract_funder_info_raw(text, lines, start_idx):
+def extract_funder_info_raw(text):
     """
-    Extract funder information handling multiline cases.
+    Extract funder information from the text matched after "funded by".
+    Continuation lines are already part of the match (up to a blank line or heading).
     Returns a tuple (cleaned_name, link)
     NO NORMALIZATION - keeps original text
     """
     # Clean initial text
     funder = text.strip()
     
-    # If text seems incomplete, check next line as well
-    if start_idx + 1 < len(lines):
-        next_line = lines[start_idx + 1].strip()
-        if next_line and not next_line.startswith('#') and not next_line.startswith('*'):
-            if funder.endswith(',') or len(funder) < 5:
-                funder += ' ' + next_line
-    
     # Extract links before cleaning text
     links = extract_links_from_markdown(funder)
     funder_link = links[0] if links else ""
@@ -160,14 +188,14 @@ def extract_funder_info_raw(text, lines, start_idx):
     funder = clean_markdown_links(funder)
     
     # Remove residual special characters at beginning
-    funder = re.sub(r'^[\[\]\(\)\{\}]+', '', funder)
+    funder = LEADING_BRACKETS_PATTERN.sub('', funder)
     
     # Remove end patterns
-    funder = re.sub(r'This feature was.*$', '', funder, flags=re.IGNORECASE)
+    funder = TRAILING_SENTENCE_PATTERN.sub('', funder)
     
     # Basic cleanup only - NO normalization
     funder = funder.strip()
-    funder = re.sub(r'\s+', ' ', funder)
+    funder = WHITESPACE_PATTERN.sub(' ', funder)
     
     # If empty after cleanup, return "Not specified"
     if not funder or funder == '':
@@ -175,6 +203,36 @@ def extract_funder_info_raw(text, lines, start_idx):
     
     return funder, funder_link
 
+def skip_lines(content, pos, count):
+    """
+    Return the offset of the line starting `count` lines after the one at `pos`,
+    or -1 if the document ends first.
+    """
+    for _ in range(count):
+        newline = content.find('\n', pos)
+        if newline == -1:
+            return -1
+        pos = newline + 1
+    return pos
+
+def find_section_bounds(content, line_start, boundary):
+    """
+    Return the (start, end) offsets of the text following the heading line at
+    `line_start`, up to the next section boundary or at most MAX_SECTION_LINES lines.
+    """
+    section_start = skip_lines(content, line_start, 1)
+    if section_start == -1:
+        return len(content), len(content)
+    
+    # The boundary closes the section only if it falls within the line limit
+    if boundary is not None and content.count('\n', line_start, boundary) <= MAX_SECTION_LINES:
+        return section_start, boundary
+    
+    section_end = skip_lines(content, section_start, MAX_SECTION_LINES)
+    if section_end == -1:
+        return section_start, len(content)
+    return section_start, section_end
+
 def parse_feature_info(content):
     """
     Parse markdown content to extract feature information.
@@ -190,82 +248,92 @@ def parse_feature_info(content):
     ##### This feature was developed by Developer
     """
     features = []
-    
-    # Patterns to identify sections
-    category_pattern = r'^##\s+(.+?)$'
-    feature_pattern = r'^###\s+Feature:\s*(.+?)$'
-    # Updated patterns to handle multiline cases
-    funded_pattern = r'(?:This feature was funded by|Funded by)\s+(.+?)(?=\n\n|\n###|\n##|$)'
-    developed_pattern = r'(?:This feature was developed by|Developed by)\s+(.+?)(?=\n\n|\n###|\n##|$)'
-    
-    lines = content.split('\n')
     current_category = "Unknown"
-    i = 0
     
-    while i < len(lines):
-        line = lines[i].strip()
-        
+    # Lowercase copy used to skip the attribution regexes on sections that cannot
+    # match them; only usable when lowercasing keeps every offset in place
+    content_lower = content.lower()
+    if len(content_lower) != len(content):
+        content_lower = None
+    
+    # Single scan over the document: only lines starting with "##" (after
+    # optional indentation) can open a category/feature or close a section
+    headings = [(match.start(), match.group(1)) for match in HEADING_LINE_PATTERN.finditer(content)]
+    
+    # Start offset of the next section boundary (new feature or category) after each heading
+    next_boundary = [None] * len(headings)
+    boundary = None
+    for k in range(len(headings) - 1, -1, -1):
+        next_boundary[k] = boundary
+        if SECTION_START_PATTERN.match(content, headings[k][0]):
+            boundary = headings[k][0]
+    
+    for k, (line_start, line) in enumerate(headings):
         # Check if it's a category
-        cat_match = re.match(category_pattern, line)
+        cat_match = CATEGORY_PATTERN.match(line)
         if cat_match:
             current_category = cat_match.group(1).strip()
-            i += 1
             continue
         
         # Check if it's a feature
-        feat_match = re.match(feature_pattern, line)
-        if feat_match:
-            feature_name = feat_match.group(1).strip()
-            
-            # Search for funding and development info in following lines
-            # Typically within the next 50 lines
-            funded_by = "Not specified"
-            funded_by_link = ""
-            developed_by = "Not specified"
-            developed_by_link = ""
-            
-            # Collect following text until next feature or category
-            following_text = ""
-            for j in range(i + 1, min(i + 100, len(lines))):
-                next_line = lines[j]
-                
-                # Stop if encountering a new feature or category
-                if re.match(r'^###\s+Feature:', next_line) or re.match(r'^##\s+', next_line):
-                    break
-                
-                following_text += next_line + "\n"
-            
-            # Search in the collected text (handles multiline cases)
-            funded_match = re.search(funded_pattern, following_text, re.IGNORECASE | re.DOTALL)
-            if funded_match:
-                # Replace newlines with spaces in the matched text
-                matched_text = funded_match.group(1).replace('\n', ' ')
-                funded_by, funded_by_link = extract_funder_info_raw(matched_text, [matched_text], 0)
-                if not funded_by or funded_by.strip() == '':
-                    funded_by = "Not specified"
-            
-            # Search for developed by
-            developed_match = re.search(developed_pattern, following_text, re.IGNORECASE | re.DOTALL)
-            if developed_match:
-                # Replace newlines with spaces in the matched text
-                matched_text = developed_match.group(1).replace('\n', ' ')
-                developed_by, developed_by_link = extract_developer_info_raw(matched_text, [matched_text], 0)
-                if not developed_by or developed_by.strip() == '':
-                    developed_by = "Not specified"
-            
-            features.append({
-                'category': current_category,
-                'feature_name': feature_name,
-                'funded_by': funded_by if funded_by else "Not specified",
-                'funded_by_link': funded_by_link,
-                'developed_by': developed_by if developed_by else "Not specified",
-                'developed_by_link': developed_by_link
-            })
+        feat_match = FEATURE_PATTERN.match(line)
+        if not feat_match:
+            continue
+        
+        feature_name = feat_match.group(1).strip()
+        
+        funded_by = "Not specified"
+        funded_by_link = ""
+        developed_by = "Not specified"
+        developed_by_link = ""
+        
+        # Bounds of the following text until next feature or category,
+        # within the next MAX_SECTION_LINES lines
+        section_start, section_end = find_section_bounds(content, line_start, next_boundary[k])
         
-        i += 1
+        # Search only inside the section, without copying it (handles multiline cases).
+        # Every match contains "funded by" / "developed by" in some letter case
+        if content_lower is None or content_lower.find('funded by', section_start, section_end) != -1:
+            funded_match = FUNDED_PATTERN.search(content, section_start, section_end)
+        else:
+            funded_match = None
+        if funded_match:
+            # Replace newlines with spaces in the matched text
+            matched_text = funded_match.group(1).replace('\n', ' ')
+            funded_by, funded_by_link = extract_funder_info_raw(matched_text)
+            if not funded_by or funded_by.strip() == '':
+                funded_by = "Not specified"
+        
+        # Search for developed by
+        if content_lower is None or content_lower.find('developed by', section_start, section_end) != -1:
+            developed_match = DEVELOPED_PATTERN.search(content, section_start, section_end)
+        else:
+            developed_match = None
+        if developed_match:
+            # Replace newlines with spaces in the matched text
+            matched_text = developed_match.group(1).replace('\n', ' ')
+            developed_by, developed_by_link = extract_developer_info_raw(matched_text)
+            if not developed_by or developed_by.strip() == '':
+                developed_by = "Not specified"
+        
+        # Version and file are filled in per archive by process_all_zips
+        features.append(Feature(
+            version='',
+            category=current_category,
+            feature_name=feature_name,
+            funded_by=funded_by if funded_by else "Not specified",
+            funded_by_link=funded_by_link,
+            developed_by=developed_by if developed_by else "Not specified",
+            developed_by_link=developed_by_link,
+            md_file=''
+        ))
     
     return features
 
+def parse_markdown_bytes(raw):
+    """Decode raw .md bytes and parse them (runs in the worker processes)"""
+    return parse_feature_info(raw.decode('utf-8', errors='ignore'))
+
 def process_all_zips():
     """Process all ZIP files in the download directory"""
     
@@ -274,7 +342,10 @@ def process_all_zips():
         return
     
     all_features = []
-    zip_files = sorted([f for f in os.listdir(DOWNLOAD_DIR) if f.endswith('.zip')])
+    # DirEntry objects carry name and path, no join or extra stat needed
+    with os.scandir(DOWNLOAD_DIR) as entries:
+        zip_files = [entry for entry in entries if entry.name.endswith('.zip')]
+    zip_files.sort(key=lambda entry: entry.name)
     
     if not zip_files:
         print(f"❌ No ZIP files found in {DOWNLOAD_DIR}")
@@ -283,38 +354,66 @@ def process_all_zips():
     print(f"🔍 Found {len(zip_files)} ZIP files to analyze")
     print("=" * 70)
     
-    for zip_filename in zip_files:
-        zip_path = os.path.join(DOWNLOAD_DIR, zip_filename)
-        
-        # Extract version name from filename
-        version = extract_version_from_filename(zip_filename)
-        
-        print(f"\n📦 Processing: {zip_filename}")
-        print(f"   Version: {version}")
-        
-        # Extract .md files
-        md_contents = extract_md_from_zip(zip_path)
+    # Archives are read here while the distinct markdown contents are parsed in
+    # parallel worker processes; identical changelogs (e.g. 3.4 and 3.4-LTR)
+    # are keyed by content digest and parsed only once
+    parsed_by_digest = {}
+    archives = []
+    # Submitted parses not finished yet: reading waits for one to finish when
+    # MAX_PENDING_PARSES are in flight, so the raw contents of the whole corpus
+    # are never held at once
+    pending = set()
+    
+    with ProcessPoolExecutor(max_workers=PARSE_WORKERS) as executor:
+        for zip_entry in zip_files:
+            # Extract .md files
+            md_entries = []
+            for md_filename, raw in extract_md_from_zip(zip_entry.path):
+                # Digest the raw bytes: duplicates are never decoded
+                digest = hashlib.blake2b(raw, digest_size=16).digest()
+                if digest not in parsed_by_digest:
+                    if len(pending) >= MAX_PENDING_PARSES:
+                        _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    future = executor.submit(parse_markdown_bytes, raw)
+                    parsed_by_digest[digest] = future
+                    pending.add(future)
+                md_entries.append((md_filename, digest))
+            archives.append((zip_entry.name, md_entries))
         
-        if not md_contents:
-            print(f"   ⚠️  No .md files found")
-            continue
-        
-        print(f"   📄 Found {len(md_contents)} .md file(s)")
-        
-        # Parse each .md file
-        features_count = 0
-        for md_info in md_contents:
-            # Extract features
-            features = parse_feature_info(md_info['content'])
+        for zip_filename, md_entries in archives:
+            # Extract version name from filename
+            version = sys.intern(extract_version_from_filename(zip_filename))
             
-            # Add version and file information
-            for feature in features:
-                feature['version'] = version
-                feature['md_file'] = md_info['filename']
-                all_features.append(feature)
-                features_count += 1
-        
-        print(f"   ✅ Extracted {features_count} features")
+            # Report lines for this archive, written to stdout in one call
+            report = [f"\n📦 Processing: {zip_filename}", f"   Version: {version}"]
+            
+            if not md_entries:
+                report.append(f"   ⚠️  No .md files found")
+                sys.stdout.write('\n'.join(report) + '\n')
+                continue
+            
+            report.append(f"   📄 Found {len(md_entries)} .md file(s)")
+            
+            # Add version and file information to a copy of each parsed feature.
+            # Category, developer and funder repeat across thousands of rows: interning
+            # makes the rows share one string each (results arrive unpickled from the workers)
+            zip_features = []
+            for md_filename, digest in md_entries:
+                zip_features.extend(
+                    replace(
+                        feature,
+                        version=version,
+                        md_file=md_filename,
+                        category=sys.intern(feature.category),
+                        funded_by=sys.intern(feature.funded_by),
+                        developed_by=sys.intern(feature.developed_by),
+                    )
+                    for feature in parsed_by_digest[digest].result()
+                )
+            all_features.extend(zip_features)
+            
+            report.append(f"   ✅ Extracted {len(zip_features)} features")
+            sys.stdout.write('\n'.join(report) + '\n')
     
     return all_features
 
@@ -331,10 +430,12 @@ def save_to_csv(features, output_file):
     fieldnames = ['version', 'category', 'feature_name', 
                   'funded_by', 'funded_by_link', 'developed_by', 'developed_by_link', 'md_file']
     
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(features)
+    # Rows as tuples in column order, read straight from the Feature slots
+    row_values = attrgetter(*fieldnames)
+    with open(output_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+        writer.writerows([row_values(f) for f in features])
     
     print(f"✅ Saved {len(features)} features to CSV file")
 
@@ -348,30 +449,27 @@ def print_statistics(features):
     print("📊 STATISTICS")
     print("=" * 70)
     
-    # Count by version
-    versions = {}
+    # Count versions, categories and specified fields in a single pass
+    versions = Counter()
+    categories = Counter()
+    specified_dev = 0
+    specified_fund = 0
     for f in features:
-        v = f['version']
-        versions[v] = versions.get(v, 0) + 1
+        versions[f.version] += 1
+        categories[f.category] += 1
+        if f.developed_by != 'Not specified':
+            specified_dev += 1
+        if f.funded_by != 'Not specified':
+            specified_fund += 1
     
     print(f"\n📈 Features by version:")
     for version in sorted(versions.keys(), reverse=True):
         print(f"   {version}: {versions[version]} features")
     
-    # Count by category
-    categories = {}
-    for f in features:
-        c = f['category']
-        categories[c] = categories.get(c, 0) + 1
-    
     print(f"\n📂 Top 10 categories:")
-    for category, count in sorted(categories.items(), key=lambda x: x[1], reverse=True)[:10]:
+    for category, count in categories.most_common(10):
         print(f"   {category}: {count} features")
     
-    # Count specified vs unspecified
-    specified_dev = sum(1 for f in features if f['developed_by'] != 'Not specified')
-    specified_fund = sum(1 for f in features if f['funded_by'] != 'Not specified')
-    
     print(f"\n📋 Data completeness:")
     print(f"   Developers specified: {specified_dev}/{len(features)} ({100*specified_dev/len(features):.1f}%)")
     print(f"   Funders specified: {specified_fund}/{len(features)} ({100*specified_fund/len(features):.1f}%)")
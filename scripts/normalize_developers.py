@@ -5,8 +5,11 @@ Similar to OpenRefine's clustering functionality.
 """
 
 import csv
+import os
 import re
+import sys
 from collections import defaultdict, Counter
+from functools import lru_cache
 from rapidfuzz import fuzz, process
 
 # Input and output files
@@ -17,10 +20,45 @@ MAPPING_FILE = 'output/developer_normalizations.txt'
 # Fuzzy matching threshold (0-100)
 SIMILARITY_THRESHOLD = 85
 
+# Print the details of each cluster only when run with VERBOSE=1
+VERBOSE = os.environ.get('VERBOSE') == '1'
+
+# Regex patterns compiled once at import time
+# "Name (Company)" or "Company (Name)"
+DEVELOPER_COMPANY_PATTERN = re.compile(r'^(.+?)\s*\(([^)]+)\)$')
+# Company part in parentheses at the end of the original string
+COMPANY_SUFFIX_PATTERN = re.compile(r'\(([^)]+)\)$')
+
+# Common company keywords
+COMPANY_KEYWORDS = ('lutra', 'opengis', 'oslandia', 'kartoza', 'north road',
+                    'faunalia', 'qcooperative', 'spatialys', '3liz', 'qgis',
+                    'consulting', 'gmbh', 'sarl')
+
+# Known typos and variations of developer names
+NAME_NORMALIZATIONS = {
+    'Martian Dobias': 'Martin Dobias',
+    'Alex Bruy': 'Alexander Bruy',
+    'Belgacem Nedjima': 'Nedjima Belgacem',
+    'Nyall Dawson': 'Nyall Dawson',
+    'Matthias Kuhn': 'Matthias Kuhn',
+    'Martin Dobiaš': 'Martin Dobias',
+    'Loïc Bartoletti': 'Loïc Bartoletti',
+    'Loic Bartoletti': 'Loïc Bartoletti',
+    'Mathieu Pellerin': 'Mathieu Pellerin',
+    'Germán Carrillo': 'Germán Carrillo',
+    'German Carrillo': 'Germán Carrillo',
+    'René-Luc D\'Hont': 'René-Luc D\'Hont',
+    'Rene-Luc D\'Hont': 'René-Luc D\'Hont',
+    'Alessandro Pasotti': 'Alessandro Pasotti',
+    'Sandro Santilli': 'Sandro Santilli',
+}
+
+@lru_cache(maxsize=8192)
 def extract_developer_name(developer_string):
     """
     Extract clean developer name from various formats.
     Handles: "Developer (Company)", "Company (Developer)", "Developer", etc.
+    Results are cached: the same developer string appears on many rows.
     """
     if not developer_string or developer_string == 'Not specified':
         return None
@@ -29,28 +67,23 @@ def extract_developer_name(developer_string):
     developer_string = developer_string.strip('"').strip()
     
     # Skip if it's a collaboration (multiple names)
-    if any(sep in developer_string for sep in [' & ', ' and ', ', ']):
+    if any(sep in developer_string for sep in (' & ', ' and ', ', ')):
         return developer_string  # Keep as is for now
     
     # Pattern: "Name (Company)" or "Company (Name)"
-    match = re.search(r'^(.+?)\s*\(([^)]+)\)$', developer_string)
+    match = DEVELOPER_COMPANY_PATTERN.search(developer_string)
     if match:
         first = match.group(1).strip()
         second = match.group(2).strip()
         
-        # Common company keywords
-        company_keywords = ['lutra', 'opengis', 'oslandia', 'kartoza', 'north road',
-                           'faunalia', 'qcooperative', 'spatialys', '3liz', 'qgis',
-                           'consulting', 'gmbh', 'sarl']
-        
         first_lower = first.lower()
         second_lower = second.lower()
         
         # If first part looks like a company, second is the name
-        if any(kw in first_lower for kw in company_keywords):
+        if any(kw in first_lower for kw in COMPANY_KEYWORDS):
             return second
         # If second part looks like a company, first is the name
-        elif any(kw in second_lower for kw in company_keywords):
+        elif any(kw in second_lower for kw in COMPANY_KEYWORDS):
             return first
         # If "with" is in second part, it's likely "Developer (with Company)"
         elif 'with' in second_lower:
@@ -66,31 +99,12 @@ def normalize_name_basic(name):
     if not name:
         return name
     
-    # Known typos and variations
-    normalizations = {
-        'Martian Dobias': 'Martin Dobias',
-        'Alex Bruy': 'Alexander Bruy',
-        'Belgacem Nedjima': 'Nedjima Belgacem',
-        'Nyall Dawson': 'Nyall Dawson',
-        'Matthias Kuhn': 'Matthias Kuhn',
-        'Martin Dobiaš': 'Martin Dobias',
-        'Loïc Bartoletti': 'Loïc Bartoletti',
-        'Loic Bartoletti': 'Loïc Bartoletti',
-        'Mathieu Pellerin': 'Mathieu Pellerin',
-        'Germán Carrillo': 'Germán Carrillo',
-        'German Carrillo': 'Germán Carrillo',
-        'René-Luc D\'Hont': 'René-Luc D\'Hont',
-        'Rene-Luc D\'Hont': 'René-Luc D\'Hont',
-        'Alessandro Pasotti': 'Alessandro Pasotti',
-        'Sandro Santilli': 'Sandro Santilli',
-    }
-    
     # Remove extra whitespace
     name = ' '.join(name.split())
     
     # Check known normalizations
-    if name in normalizations:
-        return normalizations[name]
+    if name in NAME_NORMALIZATIONS:
+        return NAME_NORMALIZATIONS[name]
     
     return name
 
@@ -111,46 +125,78 @@ def find_fuzzy_clusters(names, threshold=85):
     
     # Dictionary to store mappings
     name_mapping = {}
-    processed = set()
+    
+    # Names are lowercased once, not on every comparison
+    names_lower = [name.lower() for name in unique_names]
     
     print(f"🔍 Analyzing {len(unique_names)} unique developer names...")
     
-    for i, name in enumerate(unique_names):
-        if name in processed:
+    # Union-find over name positions: similar names are merged transitively, so
+    # the clusters do not depend on the order in which names are visited
+    parent = list(range(len(unique_names)))
+    
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # Path halving
+            i = parent[i]
+        return i
+    
+    for i, name_lower in enumerate(names_lower):
+        # A single rapidfuzz call scores the name against the following ones and
+        # returns only those above the threshold (as (name, ratio, index))
+        matches = process.extract(name_lower, names_lower[i + 1:], scorer=fuzz.ratio,
+                                  score_cutoff=threshold, limit=None)
+        for _, _, k in matches:
+            root_i, root_j = find(i), find(i + 1 + k)
+            if root_i != root_j:
+                # The lowest position is the root: clusters keep the order of first appearance
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+    
+    # Group names by root, in order of first appearance
+    clusters = defaultdict(list)
+    for i in range(len(unique_names)):
+        clusters[find(i)].append(i)
+    
+    # Cluster details, written at once at the end (only with VERBOSE)
+    trace = []
+    cluster_number = 0
+    for members in clusters.values():
+        if len(members) == 1:
             continue
         
-        # Find similar names
-        similar = []
-        for other_name in unique_names:
-            if other_name == name or other_name in processed:
-                continue
-            
-            # Calculate similarity
-            ratio = fuzz.ratio(name.lower(), other_name.lower())
-            
-            if ratio >= threshold:
-                similar.append((other_name, ratio, name_counts[other_name]))
+        # Use the most common variant as canonical; on ties a name of several
+        # words is preferred to a one-word handle, then the first one seen wins
+        canonical_idx = max(members, key=lambda i: (name_counts[unique_names[i]],
+                                                    len(unique_names[i].split()) > 1))
+        canonical = unique_names[canonical_idx]
         
-        if similar:
-            # Add the current name
-            similar.append((name, 100, name_counts[name]))
-            
-            # Sort by frequency (most common first)
-            similar.sort(key=lambda x: x[2], reverse=True)
-            
-            # Use the most common variant as canonical
-            canonical = similar[0][0]
-            
-            print(f"\n📋 Cluster {len(name_mapping) + 1} (canonical: '{canonical}'):")
-            for variant, ratio, count in similar:
-                if variant != canonical:
-                    print(f"   - '{variant}' (similarity: {ratio}%, count: {count}) → '{canonical}'")
-                    name_mapping[variant] = canonical
-                    processed.add(variant)
-                else:
-                    print(f"   ✓ '{canonical}' (count: {count})")
-            
-            processed.add(canonical)
+        # Only names similar to the canonical name itself are mapped onto it:
+        # members linked to the cluster through another variant keep their name
+        variants = []
+        for i in members:
+            if i != canonical_idx:
+                ratio = fuzz.ratio(names_lower[i], names_lower[canonical_idx])
+                if ratio >= threshold:
+                    variants.append((i, ratio))
+        
+        if not variants:
+            continue
+        
+        cluster_number += 1
+        if VERBOSE:
+            trace.append(f"\n📋 Cluster {cluster_number} (canonical: '{canonical}'):")
+            trace.append(f"   ✓ '{canonical}' (count: {name_counts[canonical]})")
+        
+        # Other variants by frequency (most common first)
+        variants.sort(key=lambda variant: name_counts[unique_names[variant[0]]], reverse=True)
+        for i, ratio in variants:
+            variant = unique_names[i]
+            if VERBOSE:
+                trace.append(f"   - '{variant}' (similarity: {ratio}%, count: {name_counts[variant]}) → '{canonical}'")
+            name_mapping[variant] = canonical
+    
+    if trace:
+        sys.stdout.write('\n'.join(trace) + '\n')
     
     return name_mapping
 
@@ -164,18 +210,20 @@ def normalize_developers():
     print("\n📖 Step 1: Reading and extracting developer names...")
     
     all_developers = []
-    rows = []
+    row_count = 0
     
+    # First pass over the file: only the developed_by column is kept, rows are
+    # read again and written one at a time in Steps 4-5
     try:
-        with open(INPUT_CSV, 'r', encoding='utf-8') as f:
+        with open(INPUT_CSV, 'r', encoding='utf-8', newline='', buffering=1 << 20) as f:
             reader = csv.DictReader(f)
             for row in reader:
-                rows.append(row)
+                row_count += 1
                 dev = row['developed_by']
                 if dev and dev != 'Not specified':
                     all_developers.append(dev)
         
-        print(f"✅ Read {len(rows)} rows, found {len(all_developers)} developer entries")
+        print(f"✅ Read {row_count} rows, found {len(all_developers)} developer entries")
         
     except FileNotFoundError:
         print(f"❌ File {INPUT_CSV} not found!")
@@ -184,13 +232,17 @@ def normalize_developers():
     # Step 2: Extract clean names
     print("\n🧹 Step 2: Extracting clean developer names...")
     
-    clean_names = []
-    for dev in all_developers:
+    # Exact duplicates first: each distinct developer string is extracted and
+    # normalized once, and the result is shared by all its rows (also in Step 4)
+    raw_to_clean = {}
+    for dev in dict.fromkeys(all_developers):
         name = extract_developer_name(dev)
         if name:
             # Apply basic normalizations
             name = normalize_name_basic(name)
-            clean_names.append(name)
+        raw_to_clean[dev] = name
+    
+    clean_names = [raw_to_clean[dev] for dev in all_developers if raw_to_clean[dev]]
     
     print(f"✅ Extracted {len(clean_names)} clean names")
     
@@ -206,41 +258,42 @@ def normalize_developers():
     
     normalization_stats = defaultdict(int)
     
-    for row in rows:
-        original = row['developed_by']
-        
-        if original and original != 'Not specified':
-            # Extract clean name
-            clean_name = extract_developer_name(original)
-            
-            if clean_name:
-                # Apply basic normalization
-                clean_name = normalize_name_basic(clean_name)
-                
-                # Apply fuzzy normalization if found
-                if clean_name in fuzzy_mapping:
-                    normalized = fuzzy_mapping[clean_name]
-                    normalization_stats[f"{clean_name} → {normalized}"] += 1
-                    
-                    # Reconstruct the full string with normalized name
-                    # Keep the company part if present
-                    match = re.search(r'\(([^)]+)\)$', original)
-                    if match:
-                        company = match.group(1)
-                        row['developed_by'] = f"{normalized} ({company})"
-                    else:
-                        row['developed_by'] = normalized
-    
     # Step 5: Save normalized data
     print(f"\n💾 Step 5: Saving normalized data to {OUTPUT_CSV}...")
     
-    with open(OUTPUT_CSV, 'w', encoding='utf-8', newline='') as f:
-        if rows:
-            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-            writer.writeheader()
-            writer.writerows(rows)
+    # Second pass: each row is normalized and written as soon as it is read
+    with open(INPUT_CSV, 'r', encoding='utf-8', newline='', buffering=1 << 20) as f_in, \
+            open(OUTPUT_CSV, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f_out:
+        reader = csv.DictReader(f_in)
+        writer = csv.DictWriter(f_out, fieldnames=reader.fieldnames or [])
+        
+        for row_number, row in enumerate(reader):
+            # Nothing (not even the header) is written for an input without rows
+            if row_number == 0:
+                writer.writeheader()
+            
+            original = row['developed_by']
+            
+            # Clean name computed in Step 2 (None for empty or unspecified developers)
+            clean_name = raw_to_clean.get(original)
+            
+            # Apply fuzzy normalization if found
+            if clean_name and clean_name in fuzzy_mapping:
+                normalized = fuzzy_mapping[clean_name]
+                normalization_stats[f"{clean_name} → {normalized}"] += 1
+                
+                # Reconstruct the full string with normalized name
+                # Keep the company part if present
+                match = COMPANY_SUFFIX_PATTERN.search(original)
+                if match:
+                    company = match.group(1)
+                    row['developed_by'] = f"{normalized} ({company})"
+                else:
+                    row['developed_by'] = normalized
+            
+            writer.writerow(row)
     
-    print(f"✅ Saved {len(rows)} rows to {OUTPUT_CSV}")
+    print(f"✅ Saved {row_count} rows to {OUTPUT_CSV}")
     
     # Step 6: Save normalization mapping
     print(f"\n📝 Step 6: Saving normalization mapping to {MAPPING_FILE}...")
@@ -263,7 +316,7 @@ def normalize_developers():
     print("\n" + "=" * 70)
     print("📊 SUMMARY")
     print("=" * 70)
-    print(f"Total rows processed: {len(rows)}")
+    print(f"Total rows processed: {row_count}")
     print(f"Developer entries: {len(all_developers)}")
     print(f"Unique clean names: {len(set(clean_names))}")
     print(f"Normalizations applied: {len(fuzzy_mapping)}")
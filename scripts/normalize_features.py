@@ -10,10 +10,106 @@ Legge il file CSV grezzo e applica regole di normalizzazione ai nomi degli svilu
 import csv
 import re
 import os
+import sys
+from functools import lru_cache
 
 INPUT_CSV = "output/qgis_features_raw.csv"
 OUTPUT_CSV = "output/qgis_features_normalized.csv"
 
+# Print the normalization examples only when run with VERBOSE=1
+VERBOSE = os.environ.get('VERBOSE') == '1'
+
+# Company references in parentheses removed before normalization
+# (North Road), (North), (Lutra Consulting), (Lutra), etc.
+COMPANY_REFERENCE_PATTERN = re.compile(
+    r'\s*\((?:North Road|North|Lutra Consulting|Lutra|OPENGIS\.ch|Kartoza|Oslandia|'
+    r'Faunalia|www\.kartoza\.com|http[s]?://[^\)]+)\)',
+    re.IGNORECASE
+)
+OSLANDIA_PREFIX_PATTERN = re.compile(r'^OSLANDIA\s*-\s*', re.IGNORECASE)
+COLLABORATION_PATTERN = re.compile(r'\s+in collaboration with.*$', re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+TRAILING_SLASH_PATTERN = re.compile(r'\s*/\s*$')
+
+# Rules are called with the lowercased name and whether it is a single word.
+# Each rule records in `keywords` the substrings of which at least one must occur
+# in any name it matches, so that all rules can be prefiltered with a single regex scan
+
+def contains_any(*keys):
+    """Rule matching names that contain any of the keys"""
+    def matches(name_lower, single_word):
+        return any(key in name_lower for key in keys)
+    matches.keywords = keys
+    return matches
+
+def contains_all(*keys):
+    """Rule matching names that contain all of the keys"""
+    def matches(name_lower, single_word):
+        return all(key in name_lower for key in keys)
+    matches.keywords = keys
+    return matches
+
+def starts_with_any(*prefixes, containing=''):
+    """Rule matching names that start with any of the prefixes and contain `containing`"""
+    def matches(name_lower, single_word):
+        return name_lower.startswith(prefixes) and containing in name_lower
+    matches.keywords = prefixes
+    return matches
+
+def first_name_rule(first, surname, single_token=True):
+    """
+    Rule matching a bare first name (a single word starting with `first`,
+    unless single_token is False) or a name containing both first name and surname.
+    """
+    def matches(name_lower, single_word):
+        if name_lower.startswith(first) and surname not in name_lower:
+            return not single_token or single_word
+        return first in name_lower and surname in name_lower
+    matches.keywords = (first,)
+    return matches
+
+# Lowercase names mapped directly to their canonical form
+EXACT_ALIASES = {
+    'north road': 'Nyall Dawson',
+    'matteo': 'Matteo Ghetta',
+    'alexander': 'Alexander Bruy',
+    'alex bruy': 'Alexander Bruy',
+    'alexander bruy': 'Alexander Bruy',
+    'paul': 'Paul Blottiere',
+    'pau blottiere': 'Paul Blottiere',
+}
+
+# Ordered (rule, canonical name) pairs: the order matters, first match wins
+ALIAS_RULES = (
+    (contains_any('jef-n', 'juergen', 'jürgen'), 'Jürgen Fischer'),
+    (contains_any('lutra'), 'Lutra Consulting'),
+    (starts_with_any('denis'), 'Denis Rouzaud'),
+    (starts_with_any('etienne', 'étienne'), 'Étienne Trimaille'),
+    (starts_with_any('matteo', containing='ghetta'), 'Matteo Ghetta'),
+    (first_name_rule('andrea', 'giudiceandrea'), 'Andrea Giudiceandrea'),
+    (first_name_rule('ismail', 'sunni'), 'Ismail Sunni'),
+    (first_name_rule('nathan', 'woodrow'), 'Nathan Woodrow'),
+    (first_name_rule('marco', 'bernasocchi'), 'Marco Bernasocchi'),
+    (first_name_rule('salvatore', 'larosa'), 'Salvatore Larosa'),
+    (contains_any('nyall'), 'Nyall Dawson'),
+    (contains_any('mathieu'), 'Mathieu Pellerin'),
+    (first_name_rule('alessandro', 'pasotti', single_token=False), 'Alessandro Pasotti'),
+    (starts_with_any('alex', containing='bruy'), 'Alexander Bruy'),
+    (first_name_rule('even', 'rouault'), 'Even Rouault'),
+    (contains_any('loïc', 'loic'), 'Loïc Bartoletti'),
+    (first_name_rule('martin', 'dobias'), 'Martin Dobias'),
+    (first_name_rule('matthias', 'kuhn'), 'Matthias Kuhn'),
+    (first_name_rule('julien', 'cabieces'), 'Julien Cabieces'),
+    (contains_all('pau', 'blottiere'), 'Paul Blottiere'),
+    (first_name_rule('sandro', 'santilli'), 'Sandro Santilli'),
+)
+
+# Names containing none of the rule keywords skip ALIAS_RULES entirely
+ALIAS_KEYWORDS_PATTERN = re.compile(
+    '|'.join(re.escape(keyword) for matches, _ in ALIAS_RULES for keyword in matches.keywords)
+)
+
+@lru_cache(maxsize=8192)
 def normalize_developer_name(name):
     """
     Normalize developer names according to specific rules:
@@ -49,40 +145,24 @@ def normalize_developer_name(name):
     if not name or name == "Not specified":
         return name
     
-    original_name = name
+    original_lower = name.lower()
     
     # First, check if there's OPENGIS.ch in the name (before removing it)
-    if 'opengis.ch' in name.lower() or 'opengis' in name.lower():
+    if 'opengis' in original_lower:
         return 'OPENGIS.ch'
     
     # Kartoza (any name with Kartoza) → Kartoza
-    if 'kartoza' in name.lower():
+    if 'kartoza' in original_lower:
         return 'Kartoza'
     
     # Remove company references in parentheses BEFORE normalization
-    # (North Road), (North), (Lutra Consulting), (Lutra), etc.
-    patterns_to_remove = [
-        r'\s*\(North Road\)',
-        r'\s*\(North\)',
-        r'\s*\(Lutra Consulting\)',
-        r'\s*\(Lutra\)',
-        r'\s*\(OPENGIS\.ch\)',
-        r'\s*\(Kartoza\)',
-        r'\s*\(Oslandia\)',
-        r'\s*\(OSLANDIA\)',
-        r'\s*\(Faunalia\)',
-        r'\s*\(www\.kartoza\.com\)',
-        r'\s*\(http[s]?://[^\)]+\)',
-    ]
-    
-    for pattern in patterns_to_remove:
-        name = re.sub(pattern, '', name, flags=re.IGNORECASE)
+    name = COMPANY_REFERENCE_PATTERN.sub('', name)
     
     # Remove "OSLANDIA - " prefix
-    name = re.sub(r'^OSLANDIA\s*-\s*', '', name, flags=re.IGNORECASE)
+    name = OSLANDIA_PREFIX_PATTERN.sub('', name)
     
     # Remove "in collaboration with" and similar
-    name = re.sub(r'\s+in collaboration with.*$', '', name, flags=re.IGNORECASE)
+    name = COLLABORATION_PATTERN.sub('', name)
     
     # Normalize specific names
     name = name.strip()
@@ -93,136 +173,23 @@ def normalize_developer_name(name):
     
     name_lower = name.lower()
     
-    # North Road (alone) → Nyall Dawson
-    if name_lower == 'north road':
-        return 'Nyall Dawson'
-    
-    # jef-n → Jürgen Fischer
-    if 'jef-n' in name_lower or name_lower == 'jef-n':
-        return 'Jürgen Fischer'
-    
-    # Juergen E. Fischer or Jürgen Fischer → Jürgen Fischer
-    if 'juergen' in name_lower or 'jürgen' in name_lower:
-        return 'Jürgen Fischer'
-    
-    # Lutra (any name with Lutra) → Lutra Consulting
-    if 'lutra' in name_lower:
-        return 'Lutra Consulting'
-    
-    # Denis (starts with Denis) → Denis Rouzaud
-    if name_lower.startswith('denis'):
-        return 'Denis Rouzaud'
-    
-    # Etienne/Étienne → Étienne Trimaille
-    if name_lower.startswith('etienne') or name_lower.startswith('étienne'):
-        return 'Étienne Trimaille'
-    
-    # Matteo Ghetta (starts with) → Matteo Ghetta
-    if name_lower.startswith('matteo ghetta') or name_lower.startswith('matteo'):
-        if 'ghetta' in name_lower or name_lower == 'matteo':
-            return 'Matteo Ghetta'
-    
-    # Andrea → Andrea Giudiceandrea
-    if name_lower == 'andrea' or (name_lower.startswith('andrea') and 'giudiceandrea' not in name_lower and len(name_lower.split()) == 1):
-        return 'Andrea Giudiceandrea'
-    elif 'andrea' in name_lower and 'giudiceandrea' in name_lower:
-        return 'Andrea Giudiceandrea'
-    
-    # Ismail → Ismail Sunni
-    if name_lower == 'ismail' or (name_lower.startswith('ismail') and 'sunni' not in name_lower and len(name_lower.split()) == 1):
-        return 'Ismail Sunni'
-    elif 'ismail' in name_lower and 'sunni' in name_lower:
-        return 'Ismail Sunni'
-    
-    # Nathan → Nathan Woodrow
-    if name_lower == 'nathan' or (name_lower.startswith('nathan') and 'woodrow' not in name_lower and len(name_lower.split()) == 1):
-        return 'Nathan Woodrow'
-    elif 'nathan' in name_lower and 'woodrow' in name_lower:
-        return 'Nathan Woodrow'
-    
-    # Marco → Marco Bernasocchi
-    if name_lower == 'marco' or (name_lower.startswith('marco') and 'bernasocchi' not in name_lower and len(name_lower.split()) == 1):
-        return 'Marco Bernasocchi'
-    elif 'marco' in name_lower and 'bernasocchi' in name_lower:
-        return 'Marco Bernasocchi'
-    
-    # Salvatore → Salvatore Larosa
-    if name_lower == 'salvatore' or (name_lower.startswith('salvatore') and 'larosa' not in name_lower and len(name_lower.split()) == 1):
-        return 'Salvatore Larosa'
-    elif 'salvatore' in name_lower and 'larosa' in name_lower:
-        return 'Salvatore Larosa'
-    
-    # Nyall Dawson
-    if 'nyall' in name_lower:
-        return 'Nyall Dawson'
-    
-    # Mathieu Pellerin
-    elif 'mathieu' in name_lower:
-        return 'Mathieu Pellerin'
-    
-    # Alessandro Pasotti
-    elif name_lower == 'alessandro' or (name_lower.startswith('alessandro') and 'pasotti' not in name_lower):
-        return 'Alessandro Pasotti'
-    elif 'alessandro' in name_lower and 'pasotti' in name_lower:
-        return 'Alessandro Pasotti'
-    
-    # Alexander Bruy (also handles Alex Bruy)
-    elif name_lower in ['alexander', 'alex bruy', 'alexander bruy']:
-        return 'Alexander Bruy'
-    elif (name_lower.startswith('alexander') or name_lower.startswith('alex')) and 'bruy' in name_lower:
-        return 'Alexander Bruy'
-    
-    # Even Rouault
-    elif name_lower == 'even' or (name_lower.startswith('even') and 'rouault' not in name_lower and len(name_lower.split()) == 1):
-        return 'Even Rouault'
-    elif 'even' in name_lower and 'rouault' in name_lower:
-        return 'Even Rouault'
-    
-    # Loïc Bartoletti
-    elif 'loïc' in name_lower or 'loic' in name_lower:
-        if 'bartoletti' not in name_lower:
-            return 'Loïc Bartoletti'
-        else:
-            return 'Loïc Bartoletti'
-    
-    # Martin Dobias
-    elif name_lower == 'martin' or (name_lower.startswith('martin') and 'dobias' not in name_lower and len(name_lower.split()) == 1):
-        return 'Martin Dobias'
-    elif 'martin' in name_lower and 'dobias' in name_lower:
-        return 'Martin Dobias'
-    
-    # Matthias Kuhn
-    elif name_lower == 'matthias' or (name_lower.startswith('matthias') and 'kuhn' not in name_lower and len(name_lower.split()) == 1):
-        return 'Matthias Kuhn'
-    elif 'matthias' in name_lower and 'kuhn' in name_lower:
-        return 'Matthias Kuhn'
-    
-    # Julien Cabieces
-    elif name_lower == 'julien' or (name_lower.startswith('julien') and 'cabieces' not in name_lower and len(name_lower.split()) == 1):
-        return 'Julien Cabieces'
-    elif 'julien' in name_lower and 'cabieces' in name_lower:
-        return 'Julien Cabieces'
-    
-    # Paul Blottiere (handles Paul, Pau Blottiere, OSLANDIA - Paul)
-    elif name_lower in ['paul', 'pau blottiere']:
-        return 'Paul Blottiere'
-    elif 'paul' in name_lower and 'blottiere' in name_lower:
-        return 'Paul Blottiere'
-    elif 'pau' in name_lower and 'blottiere' in name_lower:
-        return 'Paul Blottiere'
-    
-    # Sandro Santilli
-    elif name_lower == 'sandro' or (name_lower.startswith('sandro') and 'santilli' not in name_lower and len(name_lower.split()) == 1):
-        return 'Sandro Santilli'
-    elif 'sandro' in name_lower and 'santilli' in name_lower:
-        return 'Sandro Santilli'
+    # Exact aliases first, then the ordered rules (first match wins)
+    if name_lower in EXACT_ALIASES:
+        return EXACT_ALIASES[name_lower]
+    
+    if ALIAS_KEYWORDS_PATTERN.search(name_lower):
+        # Split once for all the rules
+        single_word = len(name_lower.split()) == 1
+        for matches, canonical in ALIAS_RULES:
+            if matches(name_lower, single_word):
+                return canonical
     
     # Clean multiple spaces and trailing commas
-    name = re.sub(r'\s+', ' ', name).strip()
+    name = WHITESPACE_PATTERN.sub(' ', name).strip()
     name = name.rstrip(',').strip()
     
     # Remove trailing ' /'
-    name = re.sub(r'\s*/\s*$', '', name).strip()
+    name = TRAILING_SLASH_PATTERN.sub('', name).strip()
     
     # Final check: if after all cleaning the name is empty
     if not name or name == '':
@@ -240,46 +207,66 @@ def normalize_csv(input_file, output_file):
     
     print(f"📖 Reading raw data from {input_file}...")
     
-    # Read input CSV
-    features = []
-    with open(input_file, 'r', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        features = list(reader)
+    fieldnames = ['version', 'version_name', 'release_date', 'category', 'feature_name', 
+                  'funded_by', 'funded_by_link', 'developed_by', 'developed_by_link', 'md_file']
     
-    print(f"   Found {len(features)} features to normalize")
+    # Read input CSV column-wise: one list of values per column instead of a row
+    # object per feature (only developed_by is rewritten)
+    with open(input_file, 'r', encoding='utf-8', newline='', buffering=1 << 20) as csvfile:
+        reader = csv.reader(csvfile)
+        # An empty file has no header and no features
+        header = next(reader, [])
+        # Blank lines are skipped and short rows padded with empty values, as
+        # DictReader does, so that no row shortens the columns (values beyond
+        # the header have no column and are dropped)
+        width = len(header)
+        rows = [row if len(row) == width else (row + [''] * width)[:width]
+                for row in reader if row]
+    
+    columns = {name: [] for name in header}
+    columns.update(zip(header, map(list, zip(*rows))))
+    
+    feature_count = len(rows)
+    print(f"   Found {feature_count} features to normalize")
     
     # Apply normalization
     print(f"\n🔧 Applying normalization rules...")
-    normalized_count = 0
-    
-    for feature in features:
-        original_dev = feature['developed_by']
-        normalized_dev = normalize_developer_name(original_dev)
-        
-        if original_dev != normalized_dev:
-            normalized_count += 1
-            if normalized_count <= 10:  # Show first 10 examples
-                print(f"   '{original_dev}' → '{normalized_dev}'")
-        
-        feature['developed_by'] = normalized_dev
-    
-    if normalized_count > 10:
-        print(f"   ... and {normalized_count - 10} more normalizations")
+    
+    # Columns missing from the input are read (and written) empty
+    empty_column = [''] * feature_count
+    
+    # The whole developed_by column is mapped at once (cached per distinct name)
+    developers_column = columns.get('developed_by', empty_column)
+    normalized_column = list(map(normalize_developer_name, developers_column))
+    
+    changes = [(original_dev, normalized_dev)
+               for original_dev, normalized_dev in zip(developers_column, normalized_column)
+               if original_dev != normalized_dev]
+    normalized_count = len(changes)
+    
+    columns['developed_by'] = normalized_column
+    
+    if VERBOSE and changes:
+        # First 10 examples, written at once
+        trace = [f"   '{original_dev}' → '{normalized_dev}'" for original_dev, normalized_dev in changes[:10]]
+        if normalized_count > 10:
+            trace.append(f"   ... and {normalized_count - 10} more normalizations")
+        sys.stdout.write('\n'.join(trace) + '\n')
     
     print(f"\n   Total normalizations applied: {normalized_count}")
     
     # Save normalized CSV
     print(f"\n💾 Saving normalized data to {output_file}...")
     
-    fieldnames = ['version', 'version_name', 'release_date', 'category', 'feature_name', 
-                  'funded_by', 'funded_by_link', 'developed_by', 'developed_by_link', 'md_file']
+    output_columns = [columns.get(name, empty_column) for name in fieldnames]
     
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(features)
+    with open(output_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+        # Rows are rebuilt from the columns while writing
+        writer.writerows(zip(*output_columns))
     
-    print(f"✅ Saved {len(features)} normalized features")
+    print(f"✅ Saved {feature_count} normalized features")
     
     # Statistics
     print("\n" + "=" * 70)
@@ -288,8 +275,7 @@ def normalize_csv(input_file, output_file):
     
     # Count developers
     developers = {}
-    for f in features:
-        d = f['developed_by']
+    for d in columns['developed_by']:
         if d != "Not specified":
             developers[d] = developers.get(d, 0) + 1
     
@@ -299,8 +285,7 @@ def normalize_csv(input_file, output_file):
     
     # Count funders
     funders = {}
-    for f in features:
-        fund = f['funded_by']
+    for fund in columns.get('funded_by', empty_column):
         if fund != "Not specified":
             funders[fund] = funders.get(fund, 0) + 1
     
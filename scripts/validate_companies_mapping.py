@@ -5,8 +5,14 @@ Uses official team CSV files from data/ folder to verify and improve mappings.
 """
 
 import csv
+import heapq
+import re
+import sys
 from collections import defaultdict
-from rapidfuzz import fuzz
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+from rapidfuzz import fuzz, process
 
 # Reference team files
 TEAM_FILES = {
@@ -31,13 +37,18 @@ def load_reference_teams():
     
     for company, filepath in TEAM_FILES.items():
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # Extract name from different column formats
-                    name = row.get('name', '').strip()
-                    if name:
-                        teams[company].append(name)
+            with open(filepath, 'r', encoding='utf-8', newline='', buffering=1 << 20) as f:
+                reader = csv.reader(f)
+                # Only the name column is needed: resolve its position once
+                # (files without a name column have no members)
+                header = next(reader, [])
+                if 'name' in header:
+                    name_idx = header.index('name')
+                    # Blank lines are skipped, as DictReader does
+                    for row in filter(None, reader):
+                        name = row[name_idx].strip()
+                        if name:
+                            teams[company].append(name)
             print(f"✅ Loaded {len(teams[company])} members from {company}")
         except FileNotFoundError:
             print(f"⚠️  File not found: {filepath}")
@@ -51,13 +62,22 @@ def load_current_mapping():
     mapping = defaultdict(list)
     
     try:
-        with open(CURRENT_MAPPING, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                company = row['company']
-                developer = row['developer']
-                features = int(row['feature_count'])
-                mapping[company].append((developer, features))
+        with open(CURRENT_MAPPING, 'r', encoding='utf-8', newline='', buffering=1 << 20) as f:
+            reader = csv.reader(f)
+            # Resolve column positions once instead of building a dict per row
+            header = next(reader, [])
+            company_idx = header.index('company')
+            developer_idx = header.index('developer')
+            count_idx = header.index('feature_count')
+            
+            # Rows are grouped by company as they are read (blank lines are skipped,
+            # as DictReader does): the file is sorted by company, so each company's
+            # developers are added with one extend instead of an append per row.
+            # Names are interned, like a categorical column: each is stored once
+            for company, rows in groupby(filter(None, reader), key=itemgetter(company_idx)):
+                mapping[sys.intern(company)].extend(
+                    (sys.intern(row[developer_idx]), int(row[count_idx])) for row in rows
+                )
         print(f"✅ Loaded current mapping with {len(mapping)} companies")
     except FileNotFoundError:
         print(f"❌ File not found: {CURRENT_MAPPING}")
@@ -65,26 +85,56 @@ def load_current_mapping():
     
     return mapping
 
-def find_best_match(developer_name, reference_names, threshold=85):
-    """Find the best matching name from reference list."""
+# Whitespace between the tokens of Latin-1 names for fuzz.token_sort_ratio:
+# in those names rapidfuzz does not split on U+0085 and U+00A0
+LATIN1_TOKEN_SEPARATOR_PATTERN = re.compile(r'[^\S\x85\xa0]+')
+
+@lru_cache(maxsize=8192)
+def sort_tokens(name):
+    """
+    Sort the whitespace-separated tokens of a name and join them with single spaces.
+    fuzz.ratio on the sorted forms equals fuzz.token_sort_ratio on the names,
+    so each name can be tokenized and sorted once instead of on every comparison.
+    Results are cached: developers listed under several companies are sorted once.
+    """
+    if max(name, default='') > '\xff':
+        tokens = name.split()
+    else:
+        tokens = filter(None, LATIN1_TOKEN_SEPARATOR_PATTERN.split(name))
+    return ' '.join(sorted(tokens))
+
+def find_best_match(developer_name, reference_names, reference_lower, reference_sorted, threshold=85):
+    """
+    Find the best matching name from reference list.
+    reference_lower and reference_sorted hold the reference names lowercased and
+    with their tokens sorted (see sort_tokens), in the same order.
+    """
     if not reference_names:
         return None, 0
     
-    best_match = None
+    developer_lower = developer_name.lower()
+    
+    # Similarity metrics tried: ratio, partial_ratio and token_sort_ratio
+    # (computed as ratio on the sorted tokens)
+    searches = (
+        (developer_lower, reference_lower, fuzz.ratio),
+        (developer_lower, reference_lower, fuzz.partial_ratio),
+        (sort_tokens(developer_lower), reference_sorted, fuzz.ratio),
+    )
+    
+    # The best score over all metrics is the best of each metric's best: one
+    # rapidfuzz search per metric, which stops early on a perfect match
+    best_index = None
     best_score = 0
     
-    for ref_name in reference_names:
-        # Try different similarity metrics
-        ratio = fuzz.ratio(developer_name.lower(), ref_name.lower())
-        partial = fuzz.partial_ratio(developer_name.lower(), ref_name.lower())
-        token_sort = fuzz.token_sort_ratio(developer_name.lower(), ref_name.lower())
-        
-        # Use the best score
-        score = max(ratio, partial, token_sort)
-        
-        if score > best_score:
+    for query, choices, scorer in searches:
+        _, score, index = process.extractOne(query, choices, scorer=scorer)
+        # On equal scores, the first reference name in the list wins
+        if score > best_score or (score == best_score and best_index is not None and index < best_index):
             best_score = score
-            best_match = ref_name
+            best_index = index
+    
+    best_match = reference_names[best_index] if best_index is not None else None
     
     if best_score >= threshold:
         return best_match, best_score
@@ -110,6 +160,7 @@ def validate_mappings():
     # Validation results
     validated = defaultdict(list)
     suggestions = defaultdict(list)
+    # (developer, features, best match score), the score being None without reference data
     not_in_reference = defaultdict(list)
     missing_from_mapping = defaultdict(list)
     
@@ -119,36 +170,40 @@ def validate_mappings():
         if company not in reference_teams:
             # No reference data for this company
             for dev, features in developers:
-                not_in_reference[company].append((dev, features, "No reference data"))
+                not_in_reference[company].append((dev, features, None))
             continue
         
         ref_names = reference_teams[company]
+        # Lowercased once per company, not for every comparison
+        ref_lower = [ref_name.lower() for ref_name in ref_names]
+        ref_sorted = [sort_tokens(ref_name) for ref_name in ref_lower]
+        # Set for the exact-match checks (the list keeps the order for fuzzy matching)
+        ref_lower_set = set(ref_lower)
         
         for dev, features in developers:
-            # Check if developer is in reference list (exact match)
-            if dev in ref_names:
+            # Check if developer is in reference list (exact match, ignoring case):
+            # no fuzzy matching is needed for these
+            if dev.lower() in ref_lower_set:
                 validated[company].append((dev, features, 100))
             else:
                 # Try fuzzy matching
-                match, score = find_best_match(dev, ref_names, threshold=85)
+                match, score = find_best_match(dev, ref_names, ref_lower, ref_sorted, threshold=85)
                 
                 if match:
                     # Found a similar name
                     suggestions[company].append((dev, match, score, features))
                 else:
                     # Not found in reference
-                    not_in_reference[company].append((dev, features, f"Best match score: {score:.1f}%"))
+                    # The score is only formatted when the report is written
+                    not_in_reference[company].append((dev, features, score))
         
         # Check for missing developers (in reference but not in mapping)
-        mapped_devs = {dev for dev, _ in developers}
-        for ref_name in ref_names:
-            # Check if this reference name matches any mapped developer
-            found = False
-            for mapped_dev in mapped_devs:
-                score = fuzz.ratio(ref_name.lower(), mapped_dev.lower())
-                if score >= 90:  # High threshold for reverse matching
-                    found = True
-                    break
+        mapped_devs = list({dev.lower() for dev, _ in developers})
+        for ref_name, ref_name_lower in zip(ref_names, ref_lower):
+            # Check if this reference name matches any mapped developer, with a
+            # single rapidfuzz search over all of them (high threshold for reverse matching)
+            found = process.extractOne(ref_name_lower, mapped_devs, scorer=fuzz.ratio,
+                                       score_cutoff=90) is not None
             
             if not found:
                 missing_from_mapping[company].append(ref_name)
@@ -156,69 +211,76 @@ def validate_mappings():
     # Generate report
     print(f"\n💾 Generating validation report: {OUTPUT_REPORT}")
     
-    with open(OUTPUT_REPORT, 'w', encoding='utf-8') as f:
-        f.write("COMPANY-DEVELOPER MAPPING VALIDATION REPORT\n")
-        f.write("=" * 70 + "\n\n")
-        
-        # Summary
-        total_validated = sum(len(devs) for devs in validated.values())
-        total_suggestions = sum(len(devs) for devs in suggestions.values())
-        total_not_found = sum(len(devs) for devs in not_in_reference.values())
-        total_missing = sum(len(devs) for devs in missing_from_mapping.values())
-        
-        f.write("📊 SUMMARY\n")
-        f.write("-" * 70 + "\n")
-        f.write(f"✅ Validated (exact matches): {total_validated}\n")
-        f.write(f"💡 Suggestions (fuzzy matches): {total_suggestions}\n")
-        f.write(f"❓ Not in reference data: {total_not_found}\n")
-        f.write(f"🔍 Missing from mapping: {total_missing}\n")
-        f.write("\n")
+    # The report is assembled in memory and written with a single call
+    parts = []
+    parts.append("COMPANY-DEVELOPER MAPPING VALIDATION REPORT\n")
+    parts.append("=" * 70 + "\n\n")
+    
+    # Summary
+    total_validated = sum(len(devs) for devs in validated.values())
+    total_suggestions = sum(len(devs) for devs in suggestions.values())
+    total_not_found = sum(len(devs) for devs in not_in_reference.values())
+    total_missing = sum(len(devs) for devs in missing_from_mapping.values())
+    
+    parts.append("📊 SUMMARY\n")
+    parts.append("-" * 70 + "\n")
+    parts.append(f"✅ Validated (exact matches): {total_validated}\n")
+    parts.append(f"💡 Suggestions (fuzzy matches): {total_suggestions}\n")
+    parts.append(f"❓ Not in reference data: {total_not_found}\n")
+    parts.append(f"🔍 Missing from mapping: {total_missing}\n")
+    parts.append("\n")
+    
+    # Validated developers
+    if validated:
+        parts.append("=" * 70 + "\n")
+        parts.append("✅ VALIDATED DEVELOPERS (Exact matches with reference data)\n")
+        parts.append("=" * 70 + "\n\n")
         
-        # Validated developers
-        if validated:
-            f.write("=" * 70 + "\n")
-            f.write("✅ VALIDATED DEVELOPERS (Exact matches with reference data)\n")
-            f.write("=" * 70 + "\n\n")
-            
-            for company in sorted(validated.keys()):
-                f.write(f"\n🏢 {company}\n")
-                for dev, features, score in sorted(validated[company], key=lambda x: x[1], reverse=True):
-                    f.write(f"   ✓ {dev} ({features} features)\n")
+        for company in sorted(validated.keys()):
+            parts.append(f"\n🏢 {company}\n")
+            # Lines are generated straight into the report, ordered by features
+            parts.extend(f"   ✓ {dev} ({features} features)\n"
+                         for dev, features, _ in sorted(validated[company], key=itemgetter(1), reverse=True))
+    
+    # Suggestions for normalization
+    if suggestions:
+        parts.append("\n" + "=" * 70 + "\n")
+        parts.append("💡 SUGGESTIONS FOR NORMALIZATION (Fuzzy matches)\n")
+        parts.append("=" * 70 + "\n\n")
         
-        # Suggestions for normalization
-        if suggestions:
-            f.write("\n" + "=" * 70 + "\n")
-            f.write("💡 SUGGESTIONS FOR NORMALIZATION (Fuzzy matches)\n")
-            f.write("=" * 70 + "\n\n")
-            
-            for company in sorted(suggestions.keys()):
-                f.write(f"\n🏢 {company}\n")
-                for current, suggested, score, features in sorted(suggestions[company], key=lambda x: x[2], reverse=True):
-                    f.write(f"   '{current}' → '{suggested}' (similarity: {score:.1f}%, {features} features)\n")
+        for company in sorted(suggestions.keys()):
+            parts.append(f"\n🏢 {company}\n")
+            parts.extend(f"   '{current}' → '{suggested}' (similarity: {score:.1f}%, {features} features)\n"
+                         for current, suggested, score, features
+                         in sorted(suggestions[company], key=itemgetter(2), reverse=True))
+    
+    # Not found in reference
+    if not_in_reference:
+        parts.append("\n" + "=" * 70 + "\n")
+        parts.append("❓ DEVELOPERS NOT IN REFERENCE DATA\n")
+        parts.append("=" * 70 + "\n")
+        parts.append("(These might be past employees, contributors, or data quality issues)\n\n")
         
-        # Not found in reference
-        if not_in_reference:
-            f.write("\n" + "=" * 70 + "\n")
-            f.write("❓ DEVELOPERS NOT IN REFERENCE DATA\n")
-            f.write("=" * 70 + "\n")
-            f.write("(These might be past employees, contributors, or data quality issues)\n\n")
-            
-            for company in sorted(not_in_reference.keys()):
-                f.write(f"\n🏢 {company}\n")
-                for dev, features, note in sorted(not_in_reference[company], key=lambda x: x[1], reverse=True):
-                    f.write(f"   ? {dev} ({features} features) - {note}\n")
+        for company in sorted(not_in_reference.keys()):
+            parts.append(f"\n🏢 {company}\n")
+            parts.extend(f"   ? {dev} ({features} features) - "
+                         f"{'No reference data' if score is None else f'Best match score: {score:.1f}%'}\n"
+                         for dev, features, score
+                         in sorted(not_in_reference[company], key=itemgetter(1), reverse=True))
+    
+    # Missing from mapping
+    if missing_from_mapping:
+        parts.append("\n" + "=" * 70 + "\n")
+        parts.append("🔍 EMPLOYEES IN REFERENCE BUT NOT IN FEATURE MAPPING\n")
+        parts.append("=" * 70 + "\n")
+        parts.append("(These team members might not have contributed to QGIS features in the analyzed versions)\n\n")
         
-        # Missing from mapping
-        if missing_from_mapping:
-            f.write("\n" + "=" * 70 + "\n")
-            f.write("🔍 EMPLOYEES IN REFERENCE BUT NOT IN FEATURE MAPPING\n")
-            f.write("=" * 70 + "\n")
-            f.write("(These team members might not have contributed to QGIS features in the analyzed versions)\n\n")
-            
-            for company in sorted(missing_from_mapping.keys()):
-                f.write(f"\n🏢 {company} ({len(missing_from_mapping[company])} members)\n")
-                for ref_name in sorted(missing_from_mapping[company]):
-                    f.write(f"   - {ref_name}\n")
+        for company in sorted(missing_from_mapping.keys()):
+            parts.append(f"\n🏢 {company} ({len(missing_from_mapping[company])} members)\n")
+            parts.extend(f"   - {ref_name}\n" for ref_name in sorted(missing_from_mapping[company]))
+    
+    with open(OUTPUT_REPORT, 'w', encoding='utf-8') as f:
+        f.write(''.join(parts))
     
     # Console output
     print("\n" + "=" * 70)
@@ -236,7 +298,8 @@ def validate_mappings():
             for current, suggested, score, features in sug_list:
                 all_suggestions.append((company, current, suggested, score, features))
         
-        for company, current, suggested, score, features in sorted(all_suggestions, key=lambda x: x[4], reverse=True)[:10]:
+        # Only the top 10 are needed: no full sort (same order as a stable sort on ties)
+        for company, current, suggested, score, features in heapq.nlargest(10, all_suggestions, key=itemgetter(4)):
             print(f"   [{company}] '{current}' → '{suggested}' ({score:.1f}%, {features} features)")
     
     print(f"\n📁 Full report saved to: {OUTPUT_REPORT}")